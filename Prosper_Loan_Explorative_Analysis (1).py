@@ -26,14 +26,30 @@
 # In[210]:
 
 
-# import all packages and set plots to be embedded inline
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import seaborn as sb
-
-get_ipython().run_line_magic('matplotlib', 'inline')
+# import all packages and set plots to be embedded inline; pyplot comes through
+# prosper.plotting, which imports it only when the first chart is drawn
+from prosper.loader import load_loans, selected_variables
+from prosper.store import load_clean, save_clean
+from prosper.cache import StageCache, run_pipeline
+from prosper.cleaning import memory_report, stages
+from prosper.schema import category, order, states
+from prosper.aggregate import count_cube, marginal
+from prosper.correlation import Correlation
+from prosper.histogram import loan_histograms
+from prosper.query import LoanIndex
+from prosper.regression import regression_summary
+from prosper.transforms import derived
+from prosper.plotting import (amount_delinq, apr_rate, bor_box, corr_heatmap, date_cat,
+                              employment_term, homeowner_cat, income_pointplots, investors_hist,
+                              investors_relation, loan_amount, loan_box, loan_term,
+                              monthly_income, numeric_vars, pair_grid, plt, rate_amount,
+                              rating_score, state_cat, state_investors, status_cat)
+
+try:
+    get_ipython().run_line_magic('matplotlib', 'inline')
+except NameError:
+    # running as a plain python script: no inline plots, and display prints
+    display = print
 
 
 # ### Loading Dataset, and Examining Interested Features
@@ -42,8 +58,10 @@ get_ipython().run_line_magic('matplotlib', 'inline')
 # In[170]:
 
 
-# Loading dataset with pandas
-loan = pd.read_csv('prosperLoanData.csv')
+# Loading only the selected variables, with dtypes and the listing date set while parsing.
+# `python -m prosper.loader prosperLoanData.csv` compares time and peak memory against
+# reading all 81 columns.
+loan = load_loans('prosperLoanData.csv')
 
 
 # In[171]:
@@ -100,12 +118,8 @@ loan.sample(5)
 # In[172]:
 
 
-# List of variables needed for the project
-selected_variables = ['ListingCreationDate', 'Term', 'LoanStatus', 'BorrowerAPR', 'BorrowerRate',
-           'ProsperRating (Alpha)', 'ProsperScore', 'ListingCategory (numeric)', 'BorrowerState',
-           'Occupation', 'EmploymentStatus', 'IsBorrowerHomeowner', 'AmountDelinquent','IncomeRange',
-           'StatedMonthlyIncome', 'LoanCurrentDaysDelinquent', 'LoanOriginalAmount',
-           'Recommendations','Investors']
+# List of variables needed for the project (defined in prosper/loader.py)
+selected_variables
 
 
 # In[173]:
@@ -156,21 +170,22 @@ loan_df.duplicated().sum()
 # > 6. BorrowerState variable contains state codes that are not easy to understand.
 # > 7. Values of 'ProsperRating (Alpha)', 'IncomeCategory', 'ListingCreationDay', and 'ListingCreationMonth' variables not ordered. 
 # > 8. Seven variables (BorrowerAPR, ProsperRating (Alpha), ProsperScore, BorrowerState, Occupation, EmploymentStatus, AmountDelinquent) are having null values.
-# > 9. Save the clean dataframe to csv 
+# > 9. Save the clean dataframe to a feather file 
 # 
 
 # ### Data Cleaning
 # ---
-# I will start by creating a copy of the dataframe; loan_df. Thereafter, I will attempt to clean all the observed issues appropriately.
+# Each cleaning step is a named, pure stage in prosper/cleaning.py: it takes a dataframe and returns a new one. `run_pipeline` runs the stages on a copy of the selected variables and caches every stage's output under .prosper_cache, keyed by a hash of the input file and of the stage's code and parameters. A stage only runs again when something upstream of it changed, so re-running the analysis after editing a plotting cell does not repeat the cleaning. The cells below name the stage behind each step and confirm its result.
 
 # In[177]:
 
 
-# copying loan_df dataframe
-clean_loan = loan_df.copy()
+# Running the cleaning stages, skipping the ones already cached; the loans loaded in
+# In[170] are handed over so a cache miss does not parse the csv a second time
+clean_loan = run_pipeline('prosperLoanData.csv', cache = StageCache(), raw = loan)
 
-#check few rows of clean_loan
-clean_loan.head(2)
+# the stages, in order
+[stage.name for stage in stages]
 
 
 # **1. ListingCreationDate will be changed from object to datetime**
@@ -178,8 +193,7 @@ clean_loan.head(2)
 # In[178]:
 
 
-# converting ListingCreationDate to datetime
-clean_loan.loc[:,'ListingCreationDate'] = pd.to_datetime(clean_loan['ListingCreationDate'], format='%Y-%m-%d')
+# converting ListingCreationDate to datetime: the convert_dates stage
 
 # confirming the change
 clean_loan.dtypes[0:1]
@@ -190,15 +204,8 @@ clean_loan.dtypes[0:1]
 # In[179]:
 
 
-# Creating column for year
-clean_loan.loc[:,'ListingCreationYear'] = clean_loan['ListingCreationDate'].dt.year
-
-# Creating column for month 
-clean_loan.loc[:,'ListingCreationMonth'] = clean_loan['ListingCreationDate'].dt.month_name()
-
-# Creating column for day-name
-clean_loan.loc[:,'ListingCreationDay'] = clean_loan['ListingCreationDate'].dt.day_name()
-
+# Creating columns for year, month and day-name: the extract_date_parts stage, which computes
+# them from the datetime64 values with integer arithmetic (prosper/dates.py)
 
 # Confirming the new columns created
 clean_loan[['ListingCreationYear','ListingCreationMonth','ListingCreationDay']].info()
@@ -209,8 +216,7 @@ clean_loan[['ListingCreationYear','ListingCreationMonth','ListingCreationDay']].
 # In[180]:
 
 
-# changing of 'Not employed value to $0
-clean_loan.loc[:,'IncomeRange'] = clean_loan['IncomeRange'].str.replace('Not employed', '$0')
+# changing of 'Not employed value to $0: the income_not_employed stage
 
 # Confirming the change
 clean_loan.IncomeRange.unique()
@@ -221,8 +227,7 @@ clean_loan.IncomeRange.unique()
 # In[181]:
 
 
-# Changing Not displayed value to Nan
-clean_loan.loc[:,'IncomeRange'] = clean_loan['IncomeRange'].replace('Not displayed', np.nan)
+# Changing Not displayed value to Nan: the income_not_displayed stage
 
 # Confirming the change
 clean_loan.IncomeRange.value_counts()
@@ -233,13 +238,8 @@ clean_loan.IncomeRange.value_counts()
 # In[182]:
 
 
-# change incomeRange values to a qualitative or descriptive category
-category = {'$0':'No-income', '$1-24,999':'Very-low',
-            '$25,000-49,999':'Low','$50,000-74,999':'Average',
-            '$75,000-99,999':'High', '$100,000+':'Very-high'}
-
-# Create another column that would contain the descriptive categoric values
-clean_loan.loc[:,'IncomeCategory'] = clean_loan['IncomeRange'].map(category)
+# change incomeRange values to a qualitative or descriptive category: the income_category stage
+category
 
 # Confirming the change
 clean_loan.IncomeCategory.value_counts()
@@ -250,66 +250,14 @@ clean_loan.IncomeCategory.value_counts()
 # In[183]:
 
 
-states = {
-    'AK':'Alaska',
-    'AL':'Alabama',
-    'AR':'Arkansas',
-    'AZ':'Arizona',
-    'CA':'California',
-    'CO':'Colorado',
-    'CT':'Connecticut',
-    'DC':'District of Columbia',
-    'DE':'Delaware',
-    'FL':'Florida',
-    'GA':'Georgia',
-    'HI':'Hawaii',
-    'IA':'Iowa',
-    'ID':'Idaho',
-    'IL':'Illinois',
-    'IN':'Indiana',
-    'KS':'Kansas',
-    'KY':'Kentucky',
-    'LA':'Louisiana',
-    'MA':'Massachusetts',
-    'MD':'Maryland',
-    'ME':'Maine',
-    'MI':'Michigan',
-    'MN':'Minnesota',
-    'MO':'Missouri',
-    'MS':'Mississippi',
-    'MT':'Montana',
-    'NC':'North Carolina',
-    'ND':'North Dakota',
-    'NE':'Nebraska',
-    'NH':'New Hampshire',
-    'NJ':'New Jersey',
-    'NM':'New Mexico',
-    'NV':'Nevada',
-    'NY':'New York',
-    'OH':'Ohio',
-    'OK':'Oklahoma',
-    'OR':'Oregon',
-    'PA':'Pennsylvania',
-    'RI':'Rhode Island',
-    'SC':'South Carolina',
-    'SD':'South Dakota',
-    'TN':'Tennessee',
-    'TX':'Texas',
-    'UT':'Utah',
-    'VA':'Virginia',
-    'VT':'Vermont',
-    'WA':'Washington',
-    'WI':'Wisconsin',
-    'WV':'West Virginia',
-    'WY':'Wyoming'
-}
+# state codes and their full names
+states
 
 
 # In[184]:
 
 
-# Creating new column that will contain all the states full name
-clean_loan.loc[:,'State'] = loan_df['BorrowerState'].map(states)
+# Creating new column that will contain all the states full name: the state_names stage
 
 # Confirm the new column and values
 clean_loan.State.sample(5)
@@ -320,18 +268,9 @@ clean_loan.State.sample(5)
 # In[185]:
 
 
-#categorizing values in 'ProsperRating (Alpha)', 'IncomeCategory', 'ListingCreationDay', and 'ListingCreationMonth' variables
-order = {'ProsperRating (Alpha)':['HR', 'E', 'D', 'C', 'B', 'A', 'AA'],
-         'IncomeCategory':['No-income','Very-low','Low','Average', 'High','Very-high'],
-        'ListingCreationDay':['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'],
-        'ListingCreationMonth':['January','February','March','April','May','June','July','August',
-                                'September','October','November','December']}
+#categorizing values in 'ProsperRating (Alpha)', 'IncomeCategory', 'ListingCreationDay', and 'ListingCreationMonth' variables: the order_categories stage
+order
 
-for i, v in order.items():
-    ordered_var = pd.api.types.CategoricalDtype(ordered = True, categories = v)    
-    clean_loan[i] = clean_loan[i].astype(ordered_var)
-
-    
 # Confirming the changes
 clean_loan[['ProsperRating (Alpha)','IncomeCategory','ListingCreationDay','ListingCreationMonth']].dtypes
 
@@ -341,8 +280,7 @@ clean_loan[['ProsperRating (Alpha)','IncomeCategory','ListingCreationDay','Listi
 # In[186]:
 
 
-# Dropping null rows
-clean_loan = clean_loan.dropna(how = 'any', axis = 0)
+# Dropping null rows: the drop_nulls stage
 
 # Checking for null values
 display(clean_loan.isna().sum())
@@ -351,17 +289,23 @@ print('**' * 62) # demarcation line
 
 display(clean_loan.info())
 
+print('**' * 62) # demarcation line
+
+# Memory of each column with pandas' default dtypes (64-bit numbers, a string per row),
+# as cleaned, and in the storage dtypes the compact stage gives the cleaned loans
+memory_report(clean_loan)
 
-# **9. Save clean_loan dataframe to csv and be named prosper_loan**
+
+# **9. Save clean_loan dataframe to a feather file and be named prosper_loan**
 
 # In[187]:
 
 
-# Saving clean_loan dataframe as csv file
-clean_loan.to_csv('prosper_loan.csv', index = False)
+# Saving clean_loan dataframe as feather file; ordered categories and dates are kept
+save_clean(clean_loan, 'prosper_loan.feather')
 
-# Loading prosper_loan csv 
-prosper_loan = pd.read_csv('prosper_loan.csv')
+# Loading prosper_loan feather file (memory-mapped, nothing is re-parsed)
+prosper_loan = load_clean('prosper_loan.feather')
 
 # checking the first 2 rows of prosper_loan dataframe
 prosper_loan.head(2)
@@ -378,55 +322,29 @@ prosper_loan.head(2)
 # 
 # ### Visualization
 
-# To find solution to question 1, I have to categorize the required variables again in order to have visualizations that are easy to read.
+# To find solution to question 1, I will confirm the required variables kept their ordered categories in order to have visualizations that are easy to read.
 
 # In[188]:
 
 
-#categorizing values in 'ProsperRating (Alpha)', 'IncomeCategory', 'ListingCreationDay', and 'ListingCreationMonth' variables
-order = {'ProsperRating (Alpha)':['HR', 'E', 'D', 'C', 'B', 'A', 'AA'],
-         'IncomeCategory':['No-income','Very-low','Low','Average', 'High','Very-high'],
-        'ListingCreationDay':['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'],
-        'ListingCreationMonth':['January','February','March','April','May','June','July','August',
-                                'September','October','November','December']}
-# Looping the variables to be converted to categorical variables
-for i, v in order.items():
-    ordered_var = pd.api.types.CategoricalDtype(ordered = True, categories = v)    
-    prosper_loan[i] = prosper_loan[i].astype(ordered_var)
-
-    
-# Confirming the changes
+# The feather file keeps the ordered categories from In[185], so they need no re-categorizing
+# Confirming the categories
 prosper_loan[['ProsperRating (Alpha)','IncomeCategory','ListingCreationDay','ListingCreationMonth']].dtypes
 
+# Counting loans once per variable charted in this section, and per pair of variables
+# for the grouped bars; the count charts below draw from these counts instead of the rows
+cube = count_cube(prosper_loan)
+
+# Indexing the categorical and numeric columns once (prosper/query.py), so drill-downs
+# into the loans combine prebuilt bitmaps instead of scanning every row
+loan_index = LoanIndex(prosper_loan)
+
 
 # In[189]:
 
 
-# defining function for bar chart visualizations
-def date_cat():
-    """ploting of bar charts to reveal how borrowers were 
-    listed by year, month, and day    
-    """
-    color = 'royalblue'
-    
-    fig, ax = plt.subplots(nrows = 3, figsize = [12, 10])
-    fig.subplots_adjust(hspace=0.335, wspace=0.335)
-  
-    sb.countplot(data = prosper_loan, 
-                 x = 'ListingCreationYear',color = color, ax =ax[0])
-    sb.countplot(data = prosper_loan, 
-                 x = 'ListingCreationMonth',color = color,ax =ax[1])
-    sb.countplot(data = prosper_loan, 
-                 x = 'ListingCreationDay',color = color,ax =ax[2])
- 
-    ax[0].set_xlabel('Listing Years')
-    ax[0].set_title('Listings by Years', size = 15)
-    ax[1].set_xlabel('Listing Months')
-    ax[1].set_title('Listings by Months', size = 15, loc = 'left')
-    ax[2].set_xlabel('Listing Days')
-    ax[2].set_title('Listings by Days', size = 15, loc = 'left')
-
-date_cat()
+# bar charts of borrowers listed by year, month, and day (prosper/plotting.py)
+date_cat(cube)
 
 
 # ### Observations
@@ -448,29 +366,7 @@ date_cat()
 
 
 # Looking at the distribution of borrowers in accross states
-
-color = 'royalblue'
-
-ax = sb.countplot(data = prosper_loan, x = 'State', color = color)
-plt.xlabel('States', size = 12)
-plt.xticks(rotation = 90, horizontalalignment='right', size = 12)
-plt.title('Distribution of Borrowers by State', size = 15)
-
-    
-df_size = prosper_loan['State'].shape[0]
-
-type_counts = prosper_loan['State'].value_counts()
-
-locs, labels = plt.xticks(rotation = 45, horizontalalignment='right')
-    
-# Placing percentage value on each bar
-for loc, label in zip(locs, labels):
-    count = type_counts[label.get_text()]
-    pct_string = '{:0.1f}%'.format(100 * count/df_size)
-    
-    plt.text(loc, count+2, pct_string, ha = 'center', color = 'black', size = 10)
- 
-    rcParams['figure.figsize'] = 20, 12;
+state_cat(cube)
 
 
 # ### Observations
@@ -488,28 +384,8 @@ for loc, label in zip(locs, labels):
 # In[191]:
 
 
-# Function for bar charts
-def status_cat():
-    """ploting of bar charts for income-category, and employment status    
-    """
-    color = 'royalblue'
-    
-    fig, ax = plt.subplots(nrows = 2, figsize = [8, 10])
-    fig.subplots_adjust(hspace=0.335, wspace=0.335)
-  
-    sb.countplot(data = prosper_loan, 
-                 x = 'IncomeCategory',color = color, ax = ax[0])
-    
-    sb.countplot(data = prosper_loan.query('EmploymentStatus !="Other"'),
-                 x = 'EmploymentStatus', color = color, ax =ax[1])
-    
-    # Setting the axes labels and title
-    ax[0].set_xlabel('Income Category', size = 12)
-    ax[0].set_title('Income Category of Borrowers', size = 15)
-    ax[1].set_xlabel('Employment Status', size = 12)
-    ax[1].set_title('Borrowers Employment Status', size = 15, loc = 'left')
-
-status_cat()
+# bar charts for income-category, and employment status
+status_cat(cube)
 
 
 # ### Observations
@@ -529,17 +405,7 @@ status_cat()
 
 
 #Plotting doughnut chart
-loan_term = prosper_loan.Term.value_counts()
-
-fig = plt.figure(figsize =(8,5))
-
-fig, ax = plt.pie(loan_term, startangle = 190,
-        counterclock = True, wedgeprops = {'width':0.4, 'linewidth': .2})
-plt.title('Loan Duration', size = 15)
-
-plt.legend(['36 months  (69%)', '60 months  (29.1%)', '12 months  (1.9%)'], 
-           bbox_to_anchor = (.85,.5), loc = 'center', bbox_transform = plt.gcf().transFigure,)
-plt.gca().axis('equal');
+loan_term(cube);
 
 
 # ### Observations
@@ -558,17 +424,7 @@ plt.gca().axis('equal');
 
 
 # Prosper loan rate and score charts
-plt.figure(figsize = (14,5))
-
-plt.subplot(1,2,1)
-sb.countplot(data = prosper_loan, x = 'ProsperRating (Alpha)', color = color)
-plt.xlabel('Rate')
-plt.title("Prosper Borrowers' Rating", size = 15)
-
-plt.subplot(1,2,2)
-sb.countplot(data = prosper_loan, x = 'ProsperScore', color = color)
-plt.xlabel('Risk Score')
-plt.title('Prosper Risk Score', size = 15);
+rating_score(cube)
 
 
 # ### Observations
@@ -586,7 +442,16 @@ plt.title('Prosper Risk Score', size = 15);
 # In[194]:
 
 
-I
+# This cell was reconstructed: the exported notebook kept only a corrupted line here. The
+# chart follows the observations below, a linear and a log transformed histogram side by
+# side, drawn like amount_delinq (In[196]) with $1k linear bins as in In[195]
+
+# Counting the distribution variables once into fixed-bin histograms (prosper/histogram.py);
+# the histograms of a new month of loans can be added to these without recounting history
+hists = loan_histograms(prosper_loan)
+
+# Distribution of stated monthly income
+monthly_income(hists);
 
 
 # ### Observations
@@ -603,17 +468,8 @@ I
 # In[195]:
 
 
-bins = np.arange(prosper_loan.LoanOriginalAmount.min(),
-                 prosper_loan.LoanOriginalAmount.max()+ 500, 1000)
-
-xticks = [500, 1000, 2000, 5000, 10000, 20000, 35000]
-labels = ['{}'.format(k) for k in xticks]
-
-plt.figure(figsize =(8,4))
-plt.hist(data = prosper_loan, x = 'LoanOriginalAmount', bins = bins, color = color)
-plt.xscale('log')
-plt.xticks(xticks, labels)
-plt.xlabel('Loan Original Amount ($)');
+# Distribution of loan original amount
+loan_amount(hists);
 
 
 # ### Observations
@@ -631,31 +487,8 @@ plt.xlabel('Loan Original Amount ($)');
 # In[196]:
 
 
-# function for plotting amount delinquent
-def amount_delinq():
-    """ This function is to plot two histogram charts of amount delinquent.
-    The first chart is without transformation while the second chart is log
-    transformed"""
-
-    bins = 10** np.arange(.1, 10, .08)
-
-    plt.figure(figsize =(15,6))
-    
-    plt.subplot(1,2,1)
-    plt.hist(data = prosper_loan, x = 'AmountDelinquent', color = color, bins = bins)
-    plt.xlabel('Amount Delinquent ($)')
-    plt.title('Distribution of Amount Delinquent', size = 15)
-    
-    plt.subplot(1,2,2)
-    plt.hist(data = prosper_loan, x = 'AmountDelinquent', color = color, bins = bins)
-    plt.xscale('log')
-    plt.xticks([10, 100, 1000, 10000, 100000],['10', '100', '1k', '10k', '100k'])
-    plt.xlabel('Amount Delinquent ($)')
-    plt.title("Distribution of Amount Delinquent (Log Transformed)", size = 12)
-  
-
-
-amount_delinq()
+# plotting amount delinquent
+amount_delinq(hists);
 
 
 # ### Observations
@@ -671,16 +504,8 @@ amount_delinq()
 # In[197]:
 
 
-bins = 10 ** np.arange(0, 10, .05)
-
-plt.figure(figsize=[8, 6])
-plt.hist(data = prosper_loan, x = 'Investors', bins = bins)
-plt.xscale('log')
-plt.xticks([1, 1e1, 1e2, 1e3], ['1','10', '100', '1000'])
-plt.title('Distribution of Investors (Log Transformed)', size = 15)
-plt.xlabel('Number of Investors')
-plt.ylabel('Count')
-plt.xlim(0.5, 1e3);
+# Distribution of investors
+investors_hist(hists);
 
 
 # ### Observations
@@ -725,12 +550,15 @@ plt.xlim(0.5, 1e3);
 # In[198]:
 
 
-# Heatmap chart to show correlation coefficients of variables
-numeric_vars = ['Term','BorrowerAPR','LoanOriginalAmount','BorrowerRate','Investors','ProsperScore']
+# The dense charts below bin the ~83k points into a fixed grid and draw the counts;
+# set density_mode = 'scatter' to draw every point as before, or 'hexbin' for hexagons
+density_mode = 'heatmap'
 
-plt.figure(figsize=[10,6])
-sb.heatmap(prosper_loan[numeric_vars].corr(), annot = True, 
-           fmt = '.3f',cmap = 'vlag_r', center =0)
+# Heatmap chart to show correlation coefficients of variables (numeric_vars in prosper/plotting.py).
+# The matrix comes from a streaming accumulator (prosper/correlation.py): later chunks or months
+# are added with corr.update(new_loans), and segment_correlations gives one per year or state
+corr = Correlation(numeric_vars).update(prosper_loan)
+corr_heatmap(corr)
 plt.show();
 
 
@@ -738,9 +566,7 @@ plt.show();
 
 
 # Pairwise analysis of the selected numeric variables
-g = sb.PairGrid(data = prosper_loan, vars = numeric_vars)
-g = g.map_diag(plt.hist, bins = 20);
-g.map_offdiag(plt.scatter);
+pair_grid(prosper_loan, numeric_vars, mode = density_mode);
 
 
 # ### Observations
@@ -758,18 +584,8 @@ g.map_offdiag(plt.scatter);
 # In[200]:
 
 
-# scatter plot to reveal relationship between 'BorrowerAPR' and 'BorrowerRate'
-plt.figure(figsize = [8, 6])
-
-plt.scatter(data = prosper_loan, x = 'BorrowerAPR', y = 'BorrowerRate', alpha = 1/20)
-
-plt.yticks([0.05, 0.10, 0.15, 0.20, 0.25, 0.30, 0.35],
-           ['5', '10', '15', '20', '25', '30', '35'])
-plt.xticks([0.05, 0.10, 0.15, 0.20, 0.25, 0.35, 0.40],
-           ['5%','10%','15%','20%','25%','30%','40%'])
-plt.xlabel('Borrower Annual Percentage Rate (APR)')
-plt.ylabel('Borrower Rate')
-plt.title('Borrower Annual % Rate and Borrower Rate Relationship');
+# density plot to reveal relationship between 'BorrowerAPR' and 'BorrowerRate'
+apr_rate(prosper_loan, mode = density_mode);
 
 
 # ### Observations
@@ -786,22 +602,11 @@ plt.title('Borrower Annual % Rate and Borrower Rate Relationship');
 
 
 # Relationship between borrower annual percentage rate, borrower rate  and loan original amount
+rate_amount(prosper_loan, mode = density_mode);
 
-plt.figure(figsize =[12,10])
-
-plt.subplot(2,1,1)
-sb.regplot(data = prosper_loan, x = 'LoanOriginalAmount', y = 'BorrowerAPR',
-            color=color,scatter_kws={'alpha': 1/100})
-plt.xlabel('Loan Original Amount')
-plt.ylabel('Borrower Annual Percent Rate')
-plt.title('Loan Original Amount and Borrower Annual % Rate Relationship')
-
-plt.subplot(2,1,2)
-sb.regplot(data = prosper_loan, x = 'LoanOriginalAmount', y = 'BorrowerRate',
-            color=color, scatter_kws={'alpha': 1/100} )
-plt.xlabel('Loan Original Amount')
-plt.ylabel('Borrower Rate')
-plt.title('Loan Original Amount and Borrower Rate Relationship', loc = 'left');
+# slope, intercept and correlation coefficient of the fitted lines
+regression_summary(prosper_loan, [('LoanOriginalAmount', 'BorrowerAPR'),
+                                  ('LoanOriginalAmount', 'BorrowerRate')])
 
 
 # ### Observations
@@ -820,21 +625,11 @@ plt.title('Loan Original Amount and Borrower Rate Relationship', loc = 'left');
 
 
 # Investors and prosper score, investors and loan original amount relationships
-plt.figure(figsize =[12,10])
-
-plt.subplot(2,1,1)
-sb.regplot(data = prosper_loan, x = 'Investors', y = 'ProsperScore',
-            color=color,scatter_kws={'alpha': 1/10}, x_jitter = 5, y_jitter = 2)
-plt.xlabel('Investors')
-plt.ylabel('Prosper score')
-plt.title('Investors and Prosper Score Relationship')
+investors_relation(prosper_loan, mode = density_mode);
 
-plt.subplot(2,1,2)
-sb.regplot(data = prosper_loan, x = 'Investors', y = 'LoanOriginalAmount',
-            color=color,scatter_kws={'alpha': 1/100}, x_jitter = 30, y_jitter = 10)
-plt.xlabel('Investors')
-plt.ylabel('Loan Original Amount')
-plt.title('Investors and Loan Original Amount Relationship', loc = 'left');
+# slope, intercept and correlation coefficient of the fitted lines
+regression_summary(prosper_loan, [('Investors', 'ProsperScore'),
+                                  ('Investors', 'LoanOriginalAmount')])
 
 
 # ### Observations
@@ -854,22 +649,7 @@ plt.title('Investors and Loan Original Amount Relationship', loc = 'left');
 
 
 # Box plot charts for 'Income Category' by 'Prosper Score' and 'Borrower APR'
-def bor_box():
-    plt.figure(figsize = [15, 5])
-
-    plt.subplot(1, 2, 1)
-    sb.boxplot(data = prosper_loan, x = 'IncomeCategory', y = 'ProsperScore', color = 'lightblue', showfliers = False)
-    plt.xlabel('Income Category')
-    plt.ylabel('Prosper Score')
-    
-    
-    plt.subplot(1, 2, 2)
-    sb.boxplot(data = prosper_loan, x = 'IncomeCategory', y = 'BorrowerAPR', color = 'lightblue', showfliers = False)
-    plt.xlabel('Income Category')
-    plt.ylabel('Borrower APR')
-    plt.suptitle('Income Category by Prosper Score and Borrower APR', size = 15)
-    
-bor_box()
+bor_box(prosper_loan);
 
 
 # ### Observations
@@ -890,43 +670,16 @@ bor_box()
 # In[204]:
 
 
-# This is log function to transform 'Investors' and 'LoanOriginalAmount' variables.
-def log_trans(x, inverse = False):
-    """ quick function for computing log and power operations """
-    if not inverse:
-        return np.log10(x)
-    else:
-        return np.power(10, x)
-    
-prosper_loan['Log_Investors'] = prosper_loan['Investors'].apply(log_trans)
-
-prosper_loan['Log_LoanOriginalAmount'] = prosper_loan['LoanOriginalAmount'].apply(log_trans)
+# log10 transforms of 'Investors' and 'LoanOriginalAmount' (prosper/transforms.py). They run on
+# whole columns, and loan_box adds the Log_ columns itself only when it draws them
+derived
 
 
 # In[205]:
 
 
 #This function is to plot charts needed to answer question 6
-def loan_box():
-    numeric_vars2 = ['Log_LoanOriginalAmount','Log_Investors']
-    ordered_vars = ['ProsperRating (Alpha)','IncomeCategory']
-    
-    fig, ax = plt.subplots(ncols = 2, nrows = 2, figsize =[12,8])
-    
-    for i in range(len(ordered_vars)):
-        var = ordered_vars[i]
-        sb.violinplot(data = prosper_loan, x = var, y = 'Log_LoanOriginalAmount',
-                     ax = ax[i,0], color = 'lightblue')
-        ax[i,0].set_yticks(log_trans(np.array([500.0, 1.5e3, 3e3, 7.5e3, 1.5e4, 3e4, 4.5e4])))
-        ax[i,0].set_yticklabels(['500','1.5k','3k','7.5k','15k','30k','45k'])
-        
-        sb.violinplot(data = prosper_loan, x = var, y = 'Log_Investors',
-                     ax = ax[i,1], color = 'lightblue')
-        ax[i,1].set_yticks(log_trans(np.array([ 1, 5, 15, 50, 200, 600, 1200])))
-        ax[i,1].set_yticklabels(['1', '5', '15', '50', '200', '600', '1200'])
-        
-        
-loan_box()
+loan_box(prosper_loan);
 
 
 # ### Observations
@@ -951,36 +704,7 @@ loan_box()
 
 
 # Plotting bar charts for ProsperRating(Alpha) and IncomeCategory Using IsBorrowerHomeowner as hue 
-plt.figure(figsize=(15,5))
-
-total = int(len(prosper_loan))
-
-# first plot
-plt.subplot(1,2,1)
-ax = sb.countplot(data = prosper_loan, x = 'ProsperRating (Alpha)', hue ='IsBorrowerHomeowner', palette = 'Set2_r')
-ax.get_legend().set_title('Home-Owner')
-plt.xlabel('Prosper Rating')
-
-# Labeling the bars with their percent value
-for p in ax.patches:
-    percentage = '{:.1f}%'.format(100 * p.get_height()/total)
-    x = p.get_x() + p.get_width()
-    y = p.get_height()
-    ax.annotate(percentage, (x, y), ha='right', size = 10)
-
-# second plot
-plt.subplot(1,2,2)
-ax = sb.countplot(data = prosper_loan, x = 'IncomeCategory', hue ='IsBorrowerHomeowner', palette = 'Set2_r')
-ax.get_legend().set_title('Home-Owner')
-plt.xlabel('Income Category')
-
-# Labeling the bars with their percent value
-for p in ax.patches:
-    percentage = '{:.1f}%'.format(100 * p.get_height()/total)
-    x = p.get_x() + p.get_width()
-    y = p.get_height()
-    ax.annotate(percentage, (x, y), ha='right', size = 10)
-plt.suptitle('Home-Owner by Prosper-Rating and Income-Category', size = 15)
+homeowner_cat(cube)
 plt.show()
 
 
@@ -999,14 +723,7 @@ plt.show()
 
 
 # Chart to reveal distribution of investors accross states
-plt.figure(figsize = [20,20])
-sb.violinplot(data = prosper_loan.sample(10000, replace = False), y= prosper_loan['State'], 
-              x = prosper_loan['Investors'], color = 'lightblue', inner = 'quartile')
-plt.xlabel('Investors', size = 15)
-plt.ylabel('States', size = 15)
-plt.yticks(size = 12)
-plt.xticks(size = 12)
-plt.title('Distribution of Investors Accross States', size = 18);
+state_investors(prosper_loan);
 
 
 # ### Observations
@@ -1043,32 +760,7 @@ plt.title('Distribution of Investors Accross States', size = 18);
 
 """Plot for showing relationships between IncomeCategory, 
 ProsperRating, StatedMonthlyIncome, LoanOriginalAmount and AmountDelinquent"""
-
-plt.figure(figsize = [10,18])
-
-plt.subplot(3,1,1)
-sb.pointplot(data = prosper_loan, x = 'ProsperRating (Alpha)', 
-             y = 'StatedMonthlyIncome', hue = 'IncomeCategory', 
-              linestyles = "", dodge = 0.3, palette = 'Blues')
-plt.xlabel('Prosper-Rating')
-plt.ylabel('Monthly-Income')
-plt.title('Income-Category by Prosper_Rating and Monthly-Income')
-
-plt.subplot(3,1,2)
-sb.pointplot(data = prosper_loan, x = 'ProsperRating (Alpha)', 
-             y = 'LoanOriginalAmount', hue = 'IncomeCategory', 
-             dodge = 0.5, palette = 'Blues')
-plt.xlabel('Prosper-Rating')
-plt.ylabel('Loan Original Amount')
-plt.title('Income-Category by Prosper_Rating and Loan-Amount')
-
-plt.subplot(3,1,3)
-sb.pointplot(data = prosper_loan, x = 'ProsperRating (Alpha)', 
-             y = 'AmountDelinquent', hue = 'IncomeCategory', 
-             dodge = 0.3, palette = 'Blues')
-plt.xlabel('Prosper-Rating')
-plt.ylabel('Amount-Delinquent')
-plt.title('Income-Category by Prosper_Rating and Amount-Delinquent');
+income_pointplots(prosper_loan);
 
 
 # ### Observations
@@ -1088,13 +780,8 @@ plt.title('Income-Category by Prosper_Rating and Amount-Delinquent');
 # In[209]:
 
 
-plt.figure(figsize =[10,8])
-
-sb.violinplot(data = prosper_loan.query('EmploymentStatus != "Other"'), x = 'EmploymentStatus', y = 'LoanOriginalAmount',
-          hue = 'Term')
-plt.xlabel('Employment Status')
-plt.ylabel('Loan Original Amount')
-plt.title('Term by Employment-Status and Loan-Original-Amount');
+# Term by employment status and loan original amount
+employment_term(prosper_loan, loan_index);
 
 
 # ### Observations
@@ -0,0 +1,22 @@
+"""Reusable pieces of the Prosper loan explorative analysis.
+
+Submodules are imported on first use (``prosper.cleaning``, ``prosper.plotting``,
+...), so ``import prosper`` loads neither pandas nor matplotlib.
+"""
+
+import importlib
+
+
+_submodules = ['aggregate', 'bench', 'cache', 'cleaning', 'correlation', 'dates', 'density', 'histogram',
+               'incremental', 'ingest', 'kde', 'loader', 'plotting', 'profiling', 'query', 'regression', 'report',
+               'schema', 'segments', 'sketch', 'store', 'streaming', 'synth', 'transforms']
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module('prosper.' + name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + _submodules)
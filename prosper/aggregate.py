@@ -0,0 +1,115 @@
+"""Group counts of the cleaned loans, computed once and reused by every count chart.
+
+A CountCube keeps one marginal per dimension and the crosstabs of the few
+dimension pairs the charts draw. Its size depends on the number of
+categories, not on the number of loans, so reading a chart's counts from it,
+merging it with next month's and pickling it cost the same whatever the size
+of the loan book.
+"""
+
+import pandas as pd
+
+from prosper.profiling import profiled
+
+
+# dimensions of the count charts, each counted on its own
+cube_dims = ['ListingCreationYear', 'ListingCreationMonth', 'ListingCreationDay', 'State',
+             'IncomeCategory', 'EmploymentStatus', 'Term', 'ProsperRating (Alpha)', 'ProsperScore',
+             'IsBorrowerHomeowner']
+
+# (rows, columns) of the crosstabs the charts draw
+cube_pairs = [('ProsperRating (Alpha)', 'IsBorrowerHomeowner'),
+              ('IncomeCategory', 'IsBorrowerHomeowner'),
+              ('EmploymentStatus', 'Term')]
+
+
+class CountCube:
+    """ loan counts: `marginals` {dim: Series} in category order (categories
+    with no loans kept as 0), `crosstabs` {(index, columns): DataFrame} and
+    the `total` number of loans """
+
+    def __init__(self, marginals, crosstabs, total):
+        self.marginals, self.crosstabs, self.total = marginals, crosstabs, total
+
+    def __add__(self, other):
+        return merge_cubes(self, other)
+
+    def __len__(self):
+        """ number of counts kept, whatever the number of loans """
+        return sum(len(counts) for counts in self.marginals.values()) + \
+            sum(table.size for table in self.crosstabs.values())
+
+
+def _marginal(series):
+    counts = series.value_counts(sort = False)
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        counts = counts.sort_index()
+    counts.index.name = series.name
+    return counts.rename('count')
+
+
+def _crosstab(df, index, columns):
+    # by level number: index and columns may be the same column
+    return df.groupby([index, columns], observed = False).size().unstack(1, fill_value = 0)
+
+
+@profiled('aggregate/count_cube')
+def count_cube(df, dims=cube_dims, pairs=cube_pairs):
+    """ the marginal of every dimension in `dims` and the crosstab of every
+    pair in `pairs` """
+    return CountCube({dim: _marginal(df[dim]) for dim in dims},
+                     {(index, columns): _crosstab(df, index, columns) for index, columns in pairs},
+                     len(df))
+
+
+def grouped_cubes(df, by, dims=cube_dims, pairs=cube_pairs):
+    """ {segment: CountCube} for every observed value of the column `by`,
+    from one groupby per dimension and pair rather than one pass per segment """
+    segments = df[by].dropna().unique()
+    totals = df.groupby(by, observed = True).size()
+    marginals = {segment: {} for segment in segments}
+    for dim in dims:
+        categorical = isinstance(df[dim].dtype, pd.CategoricalDtype)
+        table = _crosstab(df, by, dim)
+        for segment in segments:
+            counts = table.loc[segment].rename('count')
+            counts.index.name = dim
+            # like a marginal of the segment's rows: unseen numeric values are left out
+            marginals[segment][dim] = counts if categorical else counts[counts > 0]
+    crosstabs = {segment: {} for segment in segments}
+    for index, columns in pairs:
+        table = df.groupby([by, index, columns], observed = False).size()
+        for segment in segments:
+            crosstabs[segment][index, columns] = table.xs(segment, level = 0).unstack(1, fill_value = 0)
+    return {segment: CountCube(marginals[segment], crosstabs[segment], int(totals[segment]))
+            for segment in segments}
+
+
+def merge_cubes(*cubes):
+    """ add up count cubes of different chunks or months; values seen in only
+    some of them keep their count. Costs the size of the cubes, not the
+    number of loans behind them """
+    marginals = dict(cubes[0].marginals)
+    crosstabs = dict(cubes[0].crosstabs)
+    for cube in cubes[1:]:
+        for dim, counts in cube.marginals.items():
+            merged = marginals[dim].add(counts, fill_value = 0).astype('int64')
+            marginals[dim] = merged if isinstance(merged.index, pd.CategoricalIndex) else merged.sort_index()
+        for pair, table in cube.crosstabs.items():
+            crosstabs[pair] = crosstabs[pair].add(table, fill_value = 0).astype('int64')
+    return CountCube(marginals, crosstabs, sum(cube.total for cube in cubes))
+
+
+def marginal(cube, dim, exclude=()):
+    """ counts along one dimension of the cube, in category order. Categories
+    with no loans are kept (as 0), like a countplot of a categorical column """
+    return cube.marginals[dim].drop(list(exclude), errors = 'ignore')
+
+
+def crosstab(cube, index, columns):
+    """ counts of `index` by `columns`, as a dataframe """
+    if (index, columns) in cube.crosstabs:
+        return cube.crosstabs[index, columns]
+    if (columns, index) in cube.crosstabs:
+        return cube.crosstabs[columns, index].T
+    raise KeyError('the cube has no crosstab of {!r} by {!r}'.format(index, columns))
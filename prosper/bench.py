@@ -0,0 +1,158 @@
+"""Benchmarks of every stage of the analysis on synthetic loans, written as JSON.
+
+Each size runs in a fresh process over a synthetic csv from prosper.synth,
+padded to the 81 columns of the Prosper export. The process times the load,
+every cleaning stage, the aggregates behind each question and every figure,
+and records the peak resident memory of each stage: on Linux the kernel's
+high-water mark is reset before every stage, which costs nothing (elsewhere
+only the process-wide peak is available). The csv files are generated once
+and reused.
+
+    python -m prosper.bench --rows 100000 1000000 10000000 --out bench.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from prosper.profiling import _peak_rss_mb, _reset_peak, _status_mb
+from prosper.synth import write_synthetic
+
+
+sizes = (100_000, 1_000_000, 10_000_000)
+
+# columns of the Prosper export, the analysis columns among them
+export_columns = 81
+
+
+class _Recorder:
+    # times a block and records the peak RSS while it ran
+
+    def __init__(self):
+        self.stages = []
+
+    def __call__(self, name, func, *args, **kwargs):
+        per_stage = _reset_peak()
+        before = _status_mb('VmRSS')
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        peak = _status_mb('VmHWM') if per_stage else _peak_rss_mb()
+        self.stages.append({'stage': name,
+                            'seconds': round(seconds, 4),
+                            'peak_rss_mb': round(peak, 1),
+                            'peak_scope': 'stage' if per_stage else 'process',
+                            'rss_growth_mb': round(max(peak - before, 0), 1) if per_stage else None,
+                            'rows': len(result) if isinstance(result, pd.DataFrame) else None})
+        return result
+
+
+def _aggregates(df):
+    # what each question's charts are drawn from: (stage name, function, arguments)
+    from prosper.aggregate import count_cube
+    from prosper.correlation import Correlation
+    from prosper.histogram import loan_histograms
+    from prosper.kde import grouped_kde
+    from prosper.plotting import numeric_vars
+    from prosper.regression import regression_summary
+    from prosper.sketch import grouped_digests
+    from prosper.transforms import with_derived
+
+    logs = with_derived(df, ['Log_LoanOriginalAmount', 'Log_Investors'])
+    return [('univariate/q1-q5:count_cube', count_cube, (df,)),
+            ('univariate/q6-q9:histograms', loan_histograms, (df,)),
+            ('bivariate/q1:correlation', lambda: Correlation(numeric_vars).update(df), ()),
+            ('bivariate/q3-q4:regression', regression_summary,
+             (df, [('LoanOriginalAmount', 'BorrowerAPR'), ('LoanOriginalAmount', 'BorrowerRate'),
+                   ('Investors', 'ProsperScore'), ('Investors', 'LoanOriginalAmount')])),
+            ('bivariate/q5:income_digests', lambda: [grouped_digests(df, 'IncomeCategory', column)
+                                                     for column in ('ProsperScore', 'BorrowerAPR')], ()),
+            ('bivariate/q6:violin_kde', lambda: [grouped_kde(logs, by, column)
+                                                 for by in ('ProsperRating (Alpha)', 'IncomeCategory')
+                                                 for column in ('Log_LoanOriginalAmount', 'Log_Investors')], ()),
+            ('multivariate:state_digests', grouped_digests, (df, 'State', 'Investors')),
+            ('multivariate:employment_kde', grouped_kde, (df, ['EmploymentStatus', 'Term'], 'LoanOriginalAmount'))]
+
+
+def run_size(path, figures=None):
+    """ benchmark every stage on the csv at path in this process; returns the
+    list of stage records """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from prosper import cleaning, plotting
+    from prosper.loader import load_loans
+    from prosper.report import figure_inputs, figures as report_figures
+
+    record = _Recorder()
+    df = record('load', load_loans, path)
+    for stage in cleaning.stages:
+        df = record('clean/' + stage.name, stage.func, df, **stage.params)
+
+    for name, func, args in _aggregates(df):
+        record('aggregate/' + name, func, *args)
+
+    inputs = dict(figure_inputs(df), loans = df)
+    for name in (report_figures if figures is None else figures):
+        source = report_figures[name]
+
+        def render():
+            fig = getattr(plotting, name)(inputs[source])
+            fig.savefig(io.BytesIO(), format = 'png')
+            plt.close(fig)
+        record('render/' + name, render)
+    return record.stages
+
+
+def run(rows=sizes, data_dir='bench_data', figures=None, seed=0):
+    """ benchmark every size in rows, each in a fresh process, generating the
+    synthetic csv files in data_dir when they are missing. Returns the report
+    as a dict ready for json """
+    os.makedirs(data_dir, exist_ok = True)
+    report = {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+              'machine': platform.machine(), 'cpus': os.cpu_count(),
+              'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'runs': []}
+    for n in rows:
+        path = os.path.join(data_dir, 'synthetic-{}-{}.csv'.format(n, seed))
+        if not os.path.exists(path):
+            write_synthetic(path + '.tmp', n, seed = seed, pad_to = export_columns)
+            os.replace(path + '.tmp', path)
+        with ProcessPoolExecutor(max_workers = 1) as pool:
+            stages = pool.submit(run_size, path, figures).result()
+        report['runs'].append({'rows': n, 'csv_mb': round(os.path.getsize(path) / 1024 ** 2, 1),
+                               'total_seconds': round(sum(stage['seconds'] for stage in stages), 3),
+                               'stages': stages})
+    return report
+
+
+def main(argv=None):
+    from prosper.report import figures as report_figures
+
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--rows', nargs = '+', type = int, default = list(sizes), help = 'synthetic sizes')
+    parser.add_argument('--data-dir', default = 'bench_data', help = 'where the synthetic csv files are kept')
+    parser.add_argument('--only', nargs = '+', choices = list(report_figures), help = 'figures to render')
+    parser.add_argument('--out', default = None, help = 'json file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, args.data_dir, args.only)
+    text = json.dumps(report, indent = 1)
+    if args.out is None:
+        print(text)
+    else:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+        for result in report['runs']:
+            print('{:>10,} rows  {:8.2f}s'.format(result['rows'], result['total_seconds']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""On-disk cache of cleaning-stage outputs.
+
+A stage's key hashes the key of the stage before it together with the stage's
+name, parameters and source code: that of its function and of every prosper
+function it calls, directly or through others (schema.encode, the date
+arithmetic of prosper.dates, ...); the first key hashes the raw input file and
+the loader. Changing the input, or the code or parameters of any stage,
+therefore changes the key of that stage and of every stage after it, while the
+stages before it are still served from the cache. The cache is capped in size
+and evicts the least recently used outputs first.
+"""
+
+import hashlib
+import inspect
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from prosper import cleaning
+from prosper.loader import dtypes, load_loans
+from prosper.profiling import profiler
+
+
+def file_digest(path, block_size=1 << 20):
+    """ sha256 of the file contents """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _global_names(code):
+    # names a code object and the functions and comprehensions nested in it look up
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _global_names(const)
+    return names
+
+
+def dependencies(func):
+    """ func and every function of the prosper package it calls by name,
+    directly or through others, sorted by qualified name """
+    found = {}
+    todo = [func]
+    while todo:
+        func = inspect.unwrap(todo.pop())
+        name = func.__module__ + '.' + func.__qualname__
+        if name in found:
+            continue
+        found[name] = func
+        for global_name in _global_names(func.__code__):
+            value = func.__globals__.get(global_name)
+            if inspect.isfunction(value) and value.__module__.startswith('prosper'):
+                todo.append(value)
+    return [found[name] for name in sorted(found)]
+
+
+def _code_digest(parent, name, func, params):
+    digest = hashlib.sha256(parent.encode())
+    digest.update(name.encode())
+    for dependency in dependencies(func):
+        digest.update(inspect.getsource(dependency).encode())
+    digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()
+
+
+def stage_keys(path, stages=cleaning.stages, loader=load_loans):
+    """ cache key of every stage, in order """
+    key = _code_digest(file_digest(path), 'load', loader, {'dtypes': dtypes})
+    keys = []
+    for stage in stages:
+        key = _code_digest(key, stage.name, stage.func, stage.params)
+        keys.append(key)
+    return keys
+
+
+class StageCache:
+    """ feather files named by stage key, in `directory`, holding at most
+    `max_bytes` in total """
+
+    def __init__(self, directory='.prosper_cache', max_bytes=2 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok = True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.feather')
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """ the cached dataframe, or None. A hit refreshes the entry's
+        modification time, which is what eviction orders by """
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return feather.read_table(path, memory_map = True).to_pandas(split_blocks = True)
+
+    def put(self, key, df):
+        path = self._path(key)
+        # write under a temporary name so a reader never sees a half-written file
+        feather.write_feather(pa.Table.from_pandas(df), path + '.tmp', compression = 'uncompressed')
+        os.replace(path + '.tmp', path)
+        self.evict()
+
+    def entries(self):
+        """ (modification time, size, path) of every entry, oldest first """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.feather'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(self.directory, name)))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """ remove the least recently used entries until the cache fits in max_bytes """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
+
+
+def run_pipeline(path='prosperLoanData.csv', cache=None, stages=cleaning.stages, loader=load_loans, raw=None):
+    """ load and clean `path`, starting after the last stage whose output is
+    cached. With nothing changed upstream, no stage runs and the csv is not read.
+    `raw`, the frame loader already gave for path, saves reading it again when
+    a stage has to run; the stages never modify it """
+    if cache is None:
+        cache = StageCache()
+    keys = stage_keys(path, stages, loader)
+
+    start, df = 0, None
+    for i in range(len(stages), 0, -1):
+        df = cache.get(keys[i - 1])
+        if df is not None:
+            start = i
+            break
+    if df is None:
+        df = loader(path) if raw is None else raw
+
+    for stage, key in zip(stages[start:], keys[start:]):
+        with profiler.stage('clean/' + stage.name, df) as record:
+            df = stage.func(df, **stage.params)
+            record['rows_out'] = len(df)
+        cache.put(key, df)
+    return df
@@ -0,0 +1,139 @@
+"""The cleaning steps of the analysis as named, pure stages.
+
+Every stage takes a dataframe and returns a new one without touching its input,
+so a stage's output depends only on its input, its code and its parameters.
+That is what lets prosper.cache skip stages that have already run.
+"""
+
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from prosper.dates import date_features, parse_timestamps
+from prosper.profiling import profiler
+from prosper.schema import codebooks, compact_dtypes, encode, order, remap_categories
+
+
+# name is used in cache keys and reports, params are passed to func as keywords
+Stage = namedtuple('Stage', ['name', 'func', 'params'])
+
+# derived date columns -> their prosper.dates feature
+date_parts = {'ListingCreationYear': 'year',
+                'ListingCreationMonth': 'month',
+                'ListingCreationDay': 'weekday'}
+
+
+def convert_dates(df):
+    """ 1. ListingCreationDate from string to datetime, parsed by arrow's vectorized cast """
+    return df.assign(ListingCreationDate = parse_timestamps(df['ListingCreationDate']))
+
+
+def extract_date_parts(df, features=date_parts):
+    """ 2. year, month and weekday columns from ListingCreationDate, by integer
+    arithmetic on the datetime64 values; `features` maps column -> feature and
+    can add the quarter, ISO week or hour of listing (see prosper.dates) """
+    parts = date_features(df['ListingCreationDate'], list(features.values()))
+    return df.assign(**{column: parts[feature] for column, feature in features.items()})
+
+
+def income_not_employed(df):
+    """ 3. 'Not employed' in IncomeRange means the same as '$0' """
+    return df.assign(IncomeRange = remap_categories(df['IncomeRange'], {'Not employed': '$0'}))
+
+
+def income_not_displayed(df):
+    """ 4. 'Not displayed' in IncomeRange becomes a missing value """
+    return df.assign(IncomeRange = remap_categories(df['IncomeRange'], {'Not displayed': None}))
+
+
+def income_category(df, book=codebooks['IncomeCategory']):
+    """ 5. descriptive IncomeCategory column from IncomeRange, as the codebook's
+    ordered categorical """
+    return df.assign(IncomeCategory = encode(df[book.source], book))
+
+
+def state_names(df, book=codebooks['State']):
+    """ 6. State column with the full name of BorrowerState """
+    return df.assign(State = encode(df[book.source], book))
+
+
+def order_categories(df, columns=list(order)):
+    """ 7. ordered categoricals for rating, income category, day and month, from
+    the codebook (columns that already have their categorical are kept) """
+    return df.assign(**{column: encode(df[column], codebooks[column]) for column in columns})
+
+
+def drop_nulls(df):
+    """ 8. drop every row with a missing value """
+    return df.dropna(how = 'any', axis = 0)
+
+
+def _fits(series, kind):
+    # whether every value of series is kept exactly by an integer or bool dtype
+    kind = np.dtype(kind) if kind != 'category' else None
+    if kind is None or kind.kind == 'f' or series.dtype == kind:
+        return True
+    if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object or series.hasnans:
+        return False
+    values = series.to_numpy()
+    if kind.kind == 'b':
+        return bool(np.isin(values, [0, 1]).all())
+    info = np.iinfo(kind)
+    return bool(len(values) == 0 or (values.min() >= info.min and values.max() <= info.max
+                                     and np.array_equal(values, np.round(values))))
+
+
+def compact(df, dtypes=compact_dtypes):
+    """ 9. every column in its storage dtype from compact_dtypes. A column whose
+    values do not fit (a larger loan count than Prosper has seen) keeps its dtype """
+    return df.astype({column: kind for column, kind in dtypes.items()
+                      if column in df and _fits(df[column], kind)})
+
+
+stages = [Stage('convert_dates', convert_dates, {}),
+          Stage('extract_date_parts', extract_date_parts, {'features': date_parts}),
+          Stage('income_not_employed', income_not_employed, {}),
+          Stage('income_not_displayed', income_not_displayed, {}),
+          Stage('income_category', income_category, {'book': codebooks['IncomeCategory']}),
+          Stage('state_names', state_names, {'book': codebooks['State']}),
+          Stage('order_categories', order_categories, {'columns': list(order)}),
+          Stage('drop_nulls', drop_nulls, {}),
+          Stage('compact', compact, {'dtypes': compact_dtypes})]
+
+
+def clean(df, stages=stages):
+    """ run the stages one after another, without caching """
+    for stage in stages:
+        with profiler.stage('clean/' + stage.name, df) as record:
+            df = stage.func(df, **stage.params)
+            record['rows_out'] = len(df)
+    return df
+
+
+def _default_bytes(series):
+    # bytes of the column read with pandas' defaults: 64-bit numbers and dates,
+    # one Python string object per row for text
+    if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+        labels = series.astype('category') if series.dtype == object else series
+        counts = labels.value_counts(sort = False)
+        sizes = np.array([sys.getsizeof(str(label)) for label in counts.index], dtype = np.int64)
+        return 8 * len(series) + int((counts.to_numpy() * sizes).sum())
+    return len(series) * (1 if series.dtype == bool else 8)
+
+
+def memory_report(df, compacted=None):
+    """ MB of every column of df with pandas' default dtypes (as the csv was
+    first read), as df holds it and after the compact stage (compacted, or
+    compact(df)), with the totals in the last row """
+    if compacted is None:
+        compacted = compact(df)
+    mb = 1024 ** 2
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str),
+                           'default_mb': [_default_bytes(df[column]) / mb for column in df],
+                           'mb': df.memory_usage(index = False, deep = True) / mb,
+                           'compact_dtype': compacted.dtypes.astype(str),
+                           'compact_mb': compacted.memory_usage(index = False, deep = True) / mb})
+    report.loc['total'] = ['', report['default_mb'].sum(), report['mb'].sum(), '', report['compact_mb'].sum()]
+    return report.round(3)
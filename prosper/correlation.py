@@ -0,0 +1,131 @@
+"""Streaming, mergeable covariance and correlation matrices.
+
+A Correlation keeps, for every pair of columns, the number of rows where both
+are present, the pair's means and its centered sums of squares and products.
+Chunks are folded in with Chan's parallel update, so matrices built on
+separate chunks, months, workers or segments (year, state) merge into the
+matrix of the combined rows, and the history never has to be loaded at once.
+Missing values are dropped pairwise, as DataFrame.corr does.
+
+With `ranks` (a TDigest per column, see prosper.sketch) values are replaced by
+their mid-rank on the digest's scale before they are accumulated, which gives
+Spearman's correlation. The digests take one pass of their own (rank_digests),
+or can be the ones already kept for the history so far.
+"""
+
+import numpy as np
+import pandas as pd
+
+from prosper.sketch import TDigest
+
+
+class Correlation:
+    """ pairwise count, means and co-moments of `columns`. For the pair (i, j),
+    mean[i, j] is the mean of column i over the rows where i and j are both
+    present, var[i, j] the sum of squared deviations of i over those rows and
+    comoment[i, j] the sum of products of the deviations of i and j """
+
+    def __init__(self, columns, ranks=None):
+        self.columns = list(columns)
+        self.ranks = ranks
+        k = len(self.columns)
+        self.count = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.var = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+
+    def _values(self, df):
+        values = np.column_stack([df[column].to_numpy(dtype = float, na_value = np.nan)
+                                  for column in self.columns])
+        if self.ranks is not None:
+            values = np.column_stack([self.ranks[column].mid_cdf(values[:, i])
+                                      for i, column in enumerate(self.columns)])
+        return values
+
+    def update(self, df):
+        """ add the rows of df (a frame holding every column); returns self """
+        return self._accumulate(self._values(df))
+
+    def _accumulate(self, values):
+        present = ~np.isnan(values)
+        # shift by the chunk's column means so the raw sums below do not cancel
+        shift = np.nansum(values, axis = 0) / np.maximum(present.sum(axis = 0), 1)
+        x = np.where(present, values - shift, 0)
+        w = present.astype(float)
+
+        count = w.T @ w
+        sums = x.T @ w
+        squares = (x * x).T @ w
+        products = x.T @ x
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            mean = np.where(count > 0, sums / count, 0)
+        chunk = Correlation(self.columns, self.ranks)
+        chunk.count = count
+        chunk.mean = mean + shift[:, None]
+        chunk.var = squares - sums * mean
+        chunk.comoment = products - sums * mean.T
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """ fold another accumulator over the same columns into this one; returns self """
+        if other.columns != self.columns:
+            raise ValueError('correlations over different columns cannot be merged')
+        count = self.count + other.count
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            share = np.where(count > 0, other.count / count, 0)
+        delta = other.mean - self.mean
+        weight = self.count * share
+        self.var = self.var + other.var + delta ** 2 * weight
+        self.comoment = self.comoment + other.comoment + delta * delta.T * weight
+        self.mean = self.mean + delta * share
+        self.count = count
+        return self
+
+    def __add__(self, other):
+        return self.copy().merge(other)
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    def copy(self):
+        corr = Correlation(self.columns, self.ranks)
+        corr.count, corr.mean = self.count.copy(), self.mean.copy()
+        corr.var, corr.comoment = self.var.copy(), self.comoment.copy()
+        return corr
+
+    def cov(self, ddof=1):
+        """ covariance matrix as a DataFrame """
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            cov = np.where(self.count > ddof, self.comoment / (self.count - ddof), np.nan)
+        return pd.DataFrame(cov, index = self.columns, columns = self.columns)
+
+    def corr(self):
+        """ correlation matrix as a DataFrame (Pearson, or Spearman with ranks) """
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            corr = self.comoment / np.sqrt(self.var * self.var.T)
+        corr = np.where(self.count > 1, np.clip(corr, -1, 1), np.nan)
+        return pd.DataFrame(corr, index = self.columns, columns = self.columns)
+
+
+def rank_digests(df, columns, compression=1000):
+    """ {column: TDigest} of df, the rank scale for Correlation(columns, ranks).
+    Digests of separate chunks merge like the correlations do """
+    return {column: TDigest(compression).update(df[column].to_numpy(dtype = float, na_value = np.nan))
+            for column in columns}
+
+
+def segment_correlations(df, by, columns, ranks=None):
+    """ {segment: Correlation} for every group of `by` (a column name or a list
+    of them, e.g. 'ListingCreationYear' or ['ListingCreationYear', 'State']) """
+    values = Correlation(columns, ranks)._values(df)
+    return {key: Correlation(columns, ranks)._accumulate(values[positions])
+            for key, positions in df.groupby(by, observed = True, sort = True).indices.items()}
+
+
+def merge_correlations(*parts):
+    """ merge dicts of per-segment correlations from different chunks or months """
+    merged = {}
+    for part in parts:
+        for key, corr in part.items():
+            merged[key] = merged[key].merge(corr) if key in merged else corr.copy()
+    return merged
@@ -0,0 +1,113 @@
+"""Calendar features of the listing dates by integer arithmetic on datetime64.
+
+A datetime64[ns] column is an int64 count of nanoseconds since 1970-01-01, so
+its days since the epoch are one floor division away, and year, month and
+day follow from the civil-from-days algorithm (H. Hinnant, "chrono-Compatible
+Low-Level Date Algorithms") in a handful of whole-array integer operations.
+Weekday, quarter, ISO week and hour are as cheap. The categorical features
+are built from their integer codes with their labels attached, so no string
+is ever written per row.
+
+    parts = date_features(df['ListingCreationDate'], ['year', 'month', 'weekday', 'quarter'])
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from prosper.schema import order
+
+
+_ns_per_day = 86_400_000_000_000
+_ns_per_hour = 3_600_000_000_000
+_nat = np.iinfo(np.int64).min
+
+# labels of the categorical features, in order; a feature's codes index them
+date_labels = {'month': order['ListingCreationMonth'],
+               'weekday': order['ListingCreationDay'],
+               'quarter': ['Q1', 'Q2', 'Q3', 'Q4'],
+               'iso_week': list(range(1, 54)),
+               'hour': list(range(24))}
+
+
+def parse_timestamps(values):
+    """ datetime64[ns] Series of ISO 8601 strings, parsed by arrow's string to
+    timestamp cast straight from the Arrow-backed strings; anything it cannot
+    parse (time zones, odd formats) goes through pd.to_datetime instead """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_dtype(values.dtype):
+        return values
+    try:
+        parsed = pc.cast(pa.array(values.array, from_pandas = True), pa.timestamp('ns'))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return pd.to_datetime(values, format = 'ISO8601')
+    return pd.Series(parsed.to_numpy(zero_copy_only = False), index = values.index, name = values.name)
+
+
+def civil_from_days(days):
+    """ (year, month, day) arrays of days since 1970-01-01 (proleptic Gregorian) """
+    z = np.asarray(days, dtype = np.int64) + 719468
+    era = np.floor_divide(z, 146097)
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    return yoe + era * 400 + (month <= 2), month, day
+
+
+def days_from_civil(year, month, day):
+    """ days since 1970-01-01 of (year, month, day) arrays, the inverse of civil_from_days """
+    year = np.asarray(year, dtype = np.int64) - (np.asarray(month) <= 2)
+    era = np.floor_divide(year, 400)
+    yoe = year - era * 400
+    doy = (153 * ((np.asarray(month, dtype = np.int64) + 9) % 12) + 2) // 5 + np.asarray(day) - 1
+    return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+
+
+def _categorical(codes, name, missing, index):
+    codes = np.where(missing, -1, codes).astype(np.int8)
+    kind = pd.CategoricalDtype(date_labels[name], ordered = True)
+    return pd.Series(pd.Categorical.from_codes(codes, dtype = kind), index = index)
+
+
+def date_features(dates, names=('year', 'month', 'weekday')):
+    """ {name: Series} of calendar features of a datetime64 Series: 'year'
+    (int16, float with NaN when dates has NaT), 'day' (int8 day of month) and
+    the categoricals 'month', 'weekday' (Monday first), 'quarter',
+    'iso_week' and 'hour' """
+    unknown = set(names) - {'year', 'day'} - set(date_labels)
+    if unknown:
+        raise ValueError('unknown date features: {}'.format(', '.join(sorted(unknown))))
+    ns = dates.to_numpy(dtype = 'datetime64[ns]').view(np.int64)
+    missing = ns == _nat
+    days = np.floor_divide(ns, _ns_per_day)
+    year, month, day = civil_from_days(days)
+    # 1970-01-01 was a Thursday: day 0 is weekday 3 counting from Monday
+    weekday = (days + 3) % 7
+
+    features = {}
+    for name in names:
+        if name == 'year':
+            features[name] = pd.Series(np.where(missing, np.nan, year) if missing.any() else year.astype(np.int16),
+                                       index = dates.index)
+        elif name == 'day':
+            features[name] = pd.Series(np.where(missing, np.nan, day) if missing.any() else day.astype(np.int8),
+                                       index = dates.index)
+        elif name == 'month':
+            features[name] = _categorical(month - 1, name, missing, dates.index)
+        elif name == 'weekday':
+            features[name] = _categorical(weekday, name, missing, dates.index)
+        elif name == 'quarter':
+            features[name] = _categorical((month - 1) // 3, name, missing, dates.index)
+        elif name == 'iso_week':
+            # the ISO week is the week of its Thursday, counted from the first Thursday of that year
+            thursday = days - weekday + 3
+            iso_year = civil_from_days(thursday)[0]
+            week = (thursday - days_from_civil(iso_year, 1, 1)) // 7
+            features[name] = _categorical(week, name, missing, dates.index)
+        elif name == 'hour':
+            features[name] = _categorical(np.floor_divide(ns, _ns_per_hour) % 24, name, missing, dates.index)
+    return features
@@ -0,0 +1,144 @@
+"""Mergeable histograms with fixed bin edges.
+
+The edges are fixed up front rather than derived from the data, so histograms
+built from different chunks, workers or monthly files share their bins and
+combine by adding counts. A new month of loans updates the distributions
+without rescanning the history. Histograms are keyed by the column they
+count; 'column:label' keys bin the same column a second way, like the linear
+and log views of StatedMonthlyIncome.
+"""
+
+import numpy as np
+import pandas as pd
+
+from prosper.profiling import profiled
+
+
+class Histogram:
+    """ counts of values falling in each bin of `edges`. Like np.histogram, bins
+    are half-open except the last, which includes its right edge; values
+    outside the edges or missing are not counted """
+
+    def __init__(self, edges, counts=None):
+        self.edges = np.asarray(edges, dtype = float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype = np.int64) if counts is None else np.asarray(counts, dtype = np.int64)
+
+    @classmethod
+    def linear(cls, start, stop, step):
+        """ edges start, start + step, ... up to stop """
+        return cls(np.arange(start, stop + step / 2, step))
+
+    @classmethod
+    def log(cls, start, stop, step):
+        """ edges 10 ** start, 10 ** (start + step), ... below 10 ** stop """
+        return cls(10 ** np.arange(start, stop, step))
+
+    def bin_index(self, values):
+        """ bin of every value, -1 for values outside the edges or missing """
+        values = np.asarray(values, dtype = float)
+        idx = np.searchsorted(self.edges, values, side = 'right') - 1
+        idx[values == self.edges[-1]] = len(self.counts) - 1
+        idx[idx >= len(self.counts)] = -1
+        return idx
+
+    def update(self, values):
+        """ add values to the counts; returns self """
+        idx = self.bin_index(values)
+        self.counts += np.bincount(idx[idx >= 0], minlength = len(self.counts))
+        return self
+
+    def _check(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError('histograms with different bin edges cannot be merged')
+
+    def __add__(self, other):
+        self._check(other)
+        return Histogram(self.edges, self.counts + other.counts)
+
+    def __iadd__(self, other):
+        self._check(other)
+        self.counts += other.counts
+        return self
+
+    def copy(self):
+        return Histogram(self.edges.copy(), self.counts.copy())
+
+    def total(self):
+        return int(self.counts.sum())
+
+
+@profiled('aggregate/histograms')
+def loan_histograms(df=None):
+    """ the histograms of the distribution charts, keyed by column, filled
+    from df when it is given """
+    hists = {'StatedMonthlyIncome': Histogram.log(0, 7, 0.06),
+             'StatedMonthlyIncome:linear': Histogram.linear(0, 200_000, 1000),
+             'LoanOriginalAmount': Histogram.linear(1000, 40000, 1000),
+             'AmountDelinquent': Histogram.log(.1, 10, .08),
+             'Investors': Histogram.log(0, 10, .05)}
+    if df is not None:
+        update_histograms(hists, df)
+    return hists
+
+
+def _column(key):
+    # the column a histogram key counts
+    return key.partition(':')[0]
+
+
+def update_histograms(hists, df):
+    """ add the rows of df to every histogram in hists """
+    for key, hist in hists.items():
+        hist.update(df[_column(key)].to_numpy(dtype = float, na_value = np.nan))
+    return hists
+
+
+def grouped_histograms(df, by, hists=None):
+    """ {group: histograms} for every group of the column `by`, each with the
+    bins of hists (loan_histograms by default) and the counts of the group's
+    rows. Every column is binned once for all groups """
+    if hists is None:
+        hists = loan_histograms()
+    codes, uniques = pd.factorize(df[by], sort = True)
+    groups = {group: {} for group in uniques}
+    for key, hist in hists.items():
+        idx = hist.bin_index(df[_column(key)].to_numpy(dtype = float, na_value = np.nan))
+        keep = (idx >= 0) & (codes >= 0)
+        size = len(hist.counts)
+        counts = np.bincount(codes[keep] * size + idx[keep], minlength = len(uniques) * size)
+        for group, row in zip(uniques, counts.reshape(len(uniques), size)):
+            groups[group][key] = Histogram(hist.edges, row)
+    return groups
+
+
+def merge_histograms(*parts):
+    """ add up dicts of histograms from different chunks, workers or months """
+    merged = {column: hist.copy() for column, hist in parts[0].items()}
+    for part in parts[1:]:
+        for column, hist in part.items():
+            merged[column] += hist
+    return merged
+
+
+def accumulate_csv(path='prosperLoanData.csv', hists=None, chunksize=100_000):
+    """ clean `path` chunk by chunk and add it to hists (new loan_histograms
+    by default), holding one chunk in memory at a time """
+    from prosper import cleaning
+    from prosper.loader import load_loans
+
+    if hists is None:
+        hists = loan_histograms()
+    for chunk in load_loans(path, chunksize = chunksize):
+        update_histograms(hists, cleaning.clean(chunk))
+    return hists
+
+
+def save_histograms(hists, path):
+    np.savez(path, **{column + '/edges': hist.edges for column, hist in hists.items()},
+             **{column + '/counts': hist.counts for column, hist in hists.items()})
+
+
+def load_histograms(path):
+    with np.load(path) as data:
+        columns = [key[:-len('/edges')] for key in data.files if key.endswith('/edges')]
+        return {column: Histogram(data[column + '/edges'], data[column + '/counts']) for column in columns}
@@ -0,0 +1,134 @@
+"""Appending newly arrived listings to the cleaned loans and their aggregates.
+
+An IncrementalStore keeps, in one directory, the cleaned loans as one feather
+part per append and the state of everything derived from them: the
+watermark (the latest ListingCreationDate processed so far), the count cube,
+the histograms and the correlation accumulator. append() keeps only the rows
+listed after the watermark, cleans them, writes them as a new part and adds
+them to the cube, histograms and correlation, so a monthly drop costs time in
+proportion to the new listings rather than to the whole history. A cumulative
+export is still parsed whole, but only its new rows are cleaned and counted.
+
+    store = IncrementalStore('prosper_incremental')
+    store.append('prosperLoanData.csv')
+    date_cat(store.cube); monthly_income(store.hists); corr_heatmap(store.corr)
+    store.loans()                       # every cleaned loan, for the row-level charts
+
+    python -m prosper.incremental --source prosperLoanData.csv --store prosper_incremental
+"""
+
+import argparse
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from prosper import cleaning
+from prosper.aggregate import count_cube, merge_cubes
+from prosper.correlation import Correlation
+from prosper.histogram import loan_histograms, update_histograms
+from prosper.loader import load_loans
+from prosper.store import load_clean, save_clean
+
+
+watermark_column = 'ListingCreationDate'
+
+
+class IncrementalStore:
+    """ cleaned loans and their aggregates in `directory`, appended to month
+    by month. The state file is replaced only after the new part is written,
+    so an interrupted append leaves the store as it was """
+
+    def __init__(self, directory='prosper_incremental'):
+        self.directory = os.fspath(directory)
+        self.parts_dir = os.path.join(self.directory, 'loans')
+        self.state_path = os.path.join(self.directory, 'state.pkl')
+        os.makedirs(self.parts_dir, exist_ok = True)
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'rb') as f:
+                self.state = pickle.load(f)
+        else:
+            from prosper.plotting import numeric_vars
+            self.state = {'watermark': None, 'rows': 0, 'parts': [], 'cube': None,
+                          'hists': loan_histograms(), 'corr': Correlation(numeric_vars)}
+        # parts of an append that did not finish are not part of the store
+        for name in os.listdir(self.parts_dir):
+            if name not in self.state['parts']:
+                os.remove(os.path.join(self.parts_dir, name))
+
+    @property
+    def watermark(self):
+        return self.state['watermark']
+
+    @property
+    def cube(self):
+        return self.state['cube']
+
+    @property
+    def hists(self):
+        return self.state['hists']
+
+    @property
+    def corr(self):
+        return self.state['corr']
+
+    def __len__(self):
+        return self.state['rows']
+
+    def append(self, source, stages=cleaning.stages):
+        """ clean the rows of source (a csv path or a raw frame as load_loans
+        gives it) listed after the watermark and add them to the store.
+        Returns the number of cleaned rows appended """
+        raw = load_loans(source) if isinstance(source, (str, os.PathLike)) else source
+        dates = pd.to_datetime(raw[watermark_column], format = 'ISO8601')
+        if self.watermark is not None:
+            newer = (dates > self.watermark).to_numpy()
+            raw, dates = raw[newer], dates[newer]
+        if dates.isna().all():
+            return 0
+
+        df = cleaning.clean(raw, stages)
+        state = dict(self.state)
+        # the watermark covers every row processed, kept by the cleaning or not
+        state['watermark'] = dates.max()
+        if len(df):
+            name = 'part-{:05d}.feather'.format(len(state['parts']))
+            save_clean(df, os.path.join(self.parts_dir, name))
+            state['parts'] = state['parts'] + [name]
+            state['rows'] += len(df)
+            cube = count_cube(df)
+            state['cube'] = cube if state['cube'] is None else merge_cubes(state['cube'], cube)
+            state['hists'] = {column: hist.copy() for column, hist in state['hists'].items()}
+            update_histograms(state['hists'], df)
+            state['corr'] = state['corr'] + Correlation(state['corr'].columns).update(df)
+
+        with open(self.state_path + '.tmp', 'wb') as f:
+            pickle.dump(state, f, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(self.state_path + '.tmp', self.state_path)
+        self.state = state
+        return len(df)
+
+    def loans(self, columns=None):
+        """ every cleaned loan in the store, in append order """
+        if not self.state['parts']:
+            raise ValueError('nothing has been appended to {}'.format(self.directory))
+        return load_clean(self.parts_dir, columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--source', default = 'prosperLoanData.csv', help = 'csv export or monthly drop')
+    parser.add_argument('--store', default = 'prosper_incremental', help = 'store directory')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store = IncrementalStore(args.store)
+    before = store.watermark
+    rows = store.append(args.source)
+    print('{:,} new rows after {} in {:.2f}s; {:,} rows up to {}'.format(
+        rows, before, time.perf_counter() - start, len(store), store.watermark))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Ingesting a directory of monthly export shards in parallel, without concatenating files first.
+
+Every shard is parsed by the pyarrow csv reader, which releases the GIL while
+it parses, keeping only selected_variables with their loader dtypes, and
+then goes through the cleaning stages on its own. Shards run in a pool of
+threads, one shard per task. The cleaned shards are merged once at the end:
+the categories of every categorical column are united (sorted, as pd.read_csv
+gives them) so each shard is recoded rather than converted to strings, and a
+single concat copies every row exactly once.
+
+    prosper_loan = ingest('exports/')
+
+    python -m prosper.ingest --dir shards --make 24 --rows 100000 --workers 1 2 4
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from prosper import cleaning
+from prosper.loader import dtypes, selected_variables
+from prosper.profiling import profiled
+
+
+shard_pattern = '*.csv'
+
+# arrow types of the loader dtypes
+arrow_types = {'int32': pa.int32(),
+               'float32': pa.float32(),
+               'bool': pa.bool_(),
+               'category': pa.dictionary(pa.int32(), pa.string())}
+
+
+def discover_shards(directory, pattern=shard_pattern):
+    """ the shard files of directory matching pattern, in name order (monthly
+    exports named by date sort chronologically) """
+    return sorted(glob.glob(os.path.join(os.fspath(directory), pattern)))
+
+
+def read_shard(path, columns=None):
+    """ one shard as a dataframe of `columns` (selected_variables by default)
+    with the loader dtypes. Parsing is single-threaded: the parallelism is
+    across shards """
+    columns = list(selected_variables if columns is None else columns)
+    options = pacsv.ConvertOptions(include_columns = columns, strings_can_be_null = True,
+                                   column_types = {column: arrow_types[kind] for column, kind in dtypes.items()
+                                                   if column in columns})
+    table = pacsv.read_csv(path, read_options = pacsv.ReadOptions(use_threads = False),
+                           convert_options = options)
+    return table.to_pandas()
+
+
+def _clean_shard(path, columns, stages):
+    return cleaning.clean(read_shard(path, columns), stages)
+
+
+def merge_frames(frames):
+    """ one dataframe of frames with the same columns. Categorical columns
+    get the sorted union of their categories; each frame is recoded to it
+    first, so the single concat keeps them categorical """
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    if len(frames) > 1:
+        unite = {}
+        for column in frames[0]:
+            kinds = [frame[column].dtype for frame in frames]
+            if all(isinstance(kind, pd.CategoricalDtype) for kind in kinds) and len(set(kinds)) > 1:
+                if any(kind.ordered for kind in kinds):
+                    raise ValueError('ordered categories of {!r} differ between shards'.format(column))
+                categories = pd.Index(sorted(set().union(*(kind.categories for kind in kinds))))
+                unite[column] = pd.CategoricalDtype(categories)
+        if unite:
+            frames = [frame.astype(unite) for frame in frames]
+    return pd.concat(frames, ignore_index = True)
+
+
+@profiled('ingest')
+def ingest(directory, workers=None, stages=cleaning.stages, columns=None, pattern=shard_pattern):
+    """ the cleaned loans of every shard in directory, read and cleaned in a
+    pool of `workers` threads (one per core by default) and merged in shard
+    order """
+    paths = discover_shards(directory, pattern)
+    if not paths:
+        raise FileNotFoundError('no {} shards in {}'.format(pattern, directory))
+    with ThreadPoolExecutor(max_workers = workers or os.cpu_count()) as pool:
+        frames = list(pool.map(_clean_shard, paths, [columns] * len(paths), [stages] * len(paths)))
+    return merge_frames(frames)
+
+
+def write_shards(directory, shards=24, rows=100_000, seed=0):
+    """ `shards` synthetic export shards of `rows` loans each, padded to the
+    export's width, for measuring ingestion. Existing shards are kept """
+    from prosper.bench import export_columns
+    from prosper.synth import write_synthetic
+
+    os.makedirs(directory, exist_ok = True)
+    paths = []
+    for i in range(shards):
+        path = os.path.join(directory, 'prosper-{:03d}.csv'.format(i))
+        if not os.path.exists(path):
+            write_synthetic(path + '.tmp', rows, seed = seed * 1000 + i, pad_to = export_columns)
+            os.replace(path + '.tmp', path)
+        paths.append(path)
+    return paths
+
+
+def speedup_report(directory, workers=None, stages=cleaning.stages):
+    """ wall time of ingest(directory) for each worker count (1, 2, 4, ... up
+    to the core count by default), with the speedup over one worker and the
+    parallel efficiency """
+    if workers is None:
+        cpus = os.cpu_count() or 1
+        workers = sorted({1 << i for i in range(cpus.bit_length()) if 1 << i <= cpus} | {cpus})
+    report = []
+    for n in workers:
+        start = time.perf_counter()
+        rows = len(ingest(directory, n, stages))
+        report.append({'workers': n, 'seconds': round(time.perf_counter() - start, 3), 'rows': rows})
+    report = pd.DataFrame(report).set_index('workers')
+    report['speedup'] = (report['seconds'].iloc[0] / report['seconds']).round(2)
+    report['efficiency'] = (report['speedup'] / (report.index / report.index[0])).round(2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--dir', default = 'prosper_shards', help = 'directory of csv shards')
+    parser.add_argument('--make', type = int, default = 0, help = 'first write this many synthetic shards')
+    parser.add_argument('--rows', type = int, default = 100_000, help = 'rows per synthetic shard')
+    parser.add_argument('--workers', nargs = '+', type = int, default = None,
+                        help = 'thread counts to time (default: powers of two up to the core count)')
+    args = parser.parse_args(argv)
+
+    if args.make:
+        write_shards(args.dir, args.make, args.rows)
+    print('{} shards in {}, {} cores'.format(len(discover_shards(args.dir)), args.dir, os.cpu_count()))
+    print(speedup_report(args.dir, args.workers).to_string())
+
+
+if __name__ == '__main__':
+    main()
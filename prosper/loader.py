@@ -0,0 +1,90 @@
+"""Loading the Prosper loan dataset with only the columns the analysis needs."""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from prosper.profiling import _peak_rss_mb, profiled
+
+
+# List of variables needed for the project
+selected_variables = ['ListingCreationDate', 'Term', 'LoanStatus', 'BorrowerAPR', 'BorrowerRate',
+           'ProsperRating (Alpha)', 'ProsperScore', 'ListingCategory (numeric)', 'BorrowerState',
+           'Occupation', 'EmploymentStatus', 'IsBorrowerHomeowner', 'AmountDelinquent','IncomeRange',
+           'StatedMonthlyIncome', 'LoanCurrentDaysDelinquent', 'LoanOriginalAmount',
+           'Recommendations','Investors']
+
+# Parse-time dtypes. Columns with missing values stay float, the rest are int32.
+dtypes = {'Term': 'int32',
+          'LoanStatus': 'category',
+          'BorrowerAPR': 'float32',
+          'BorrowerRate': 'float32',
+          'ProsperRating (Alpha)': 'category',
+          'ProsperScore': 'float32',
+          'ListingCategory (numeric)': 'int32',
+          'BorrowerState': 'category',
+          'Occupation': 'category',
+          'EmploymentStatus': 'category',
+          'IsBorrowerHomeowner': 'bool',
+          'AmountDelinquent': 'float32',
+          'IncomeRange': 'category',
+          'StatedMonthlyIncome': 'float32',
+          'LoanCurrentDaysDelinquent': 'int32',
+          'LoanOriginalAmount': 'int32',
+          'Recommendations': 'int32',
+          'Investors': 'int32'}
+
+date_columns = ['ListingCreationDate']
+
+
+@profiled('load')
+def load_loans(path='prosperLoanData.csv', engine='c', columns=None, **kwargs):
+    """ read the loan csv keeping only `columns` (selected_variables by default),
+    with dtypes and the listing date set while parsing.
+    engine can be 'c' or 'pyarrow'; extra keyword arguments go to pd.read_csv """
+    columns = list(selected_variables if columns is None else columns)
+
+    return pd.read_csv(path, usecols = columns, engine = engine,
+                       dtype = {k: v for k, v in dtypes.items() if k in columns},
+                       parse_dates = [c for c in date_columns if c in columns],
+                       date_format = 'ISO8601', **kwargs)
+
+
+def load_full(path='prosperLoanData.csv'):
+    """ the original load: all 81 columns, then sliced to selected_variables """
+    loan = pd.read_csv(path)
+    return loan[selected_variables]
+
+
+def _measure(name, path):
+    loaders = {'full': lambda: load_full(path),
+               'pruned': lambda: load_loans(path),
+               'pruned-pyarrow': lambda: load_loans(path, engine = 'pyarrow')}
+    before = _peak_rss_mb()
+    start = time.perf_counter()
+    frame = loaders[name]()
+    seconds = time.perf_counter() - start
+
+    return {'loader': name,
+            'seconds': round(seconds, 3),
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+            'load_rss_mb': round(_peak_rss_mb() - before, 1),
+            'frame_mb': round(frame.memory_usage(deep = True).sum() / 1024 ** 2, 1),
+            'rows': len(frame)}
+
+
+def load_report(path='prosperLoanData.csv', loaders=('full', 'pruned', 'pruned-pyarrow')):
+    """ wall time and peak RSS of each loader. Every loader runs in a fresh
+    process so the peak of one does not hide the peak of the next """
+    report = []
+    for name in loaders:
+        with ProcessPoolExecutor(max_workers = 1) as pool:
+            report.append(pool.submit(_measure, name, os.fspath(path)).result())
+    return pd.DataFrame(report).set_index('loader')
+
+
+if __name__ == '__main__':
+    print(load_report(*sys.argv[1:2]).to_string())
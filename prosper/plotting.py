@@ -0,0 +1,608 @@
+"""Charts of the analysis, drawn from the cleaned loans or their aggregates.
+
+matplotlib and seaborn are only imported when the first chart is drawn, so
+importing this module (or the package) stays cheap for jobs that never plot.
+"""
+
+import importlib
+
+import numpy as np
+
+from prosper.aggregate import crosstab, marginal
+from prosper.density import bin2d, cell_centers
+from prosper.kde import grouped_kde, kde_violin_stats
+from prosper.profiling import profiled
+from prosper.regression import bootstrap_band, confidence_band, fit_ols, predict
+from prosper.schema import display_name
+from prosper.sketch import box_stats, grouped_digests, violin_stats
+from prosper.transforms import log_ticks, with_derived
+
+
+class _LazyModule:
+    """ stand-in for a module that is imported on first attribute access """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+plt = _LazyModule('matplotlib.pyplot')
+sb = _LazyModule('seaborn')
+mcolors = _LazyModule('matplotlib.colors')
+mpatches = _LazyModule('matplotlib.patches')
+
+color = 'royalblue'
+
+# numeric variables of the correlation heatmap and the pair grid
+numeric_vars = ['Term','BorrowerAPR','LoanOriginalAmount','BorrowerRate','Investors','ProsperScore']
+
+
+def count_bar(counts, ax=None, color=color):
+    """ bar chart of pre-aggregated counts, laid out like sb.countplot """
+    if ax is None:
+        ax = plt.gca()
+    positions = np.arange(len(counts))
+    ax.bar(positions, counts.to_numpy(), width = 0.8, color = color)
+    ax.set_xticks(positions, [str(label) for label in counts.index])
+    ax.set_xlim(-0.5, len(counts) - 0.5)
+    ax.set_xlabel(counts.index.name)
+    ax.set_ylabel('count')
+    return ax
+
+
+def grouped_bar(table, ax=None, palette='Set2_r', legend_title=None):
+    """ side-by-side bars of a crosstab, one group per row and one bar per
+    column, laid out like sb.countplot with hue """
+    if ax is None:
+        ax = plt.gca()
+    positions = np.arange(len(table))
+    width = 0.8 / table.shape[1]
+    colors = plt.get_cmap(palette).colors
+    for i, column in enumerate(table.columns):
+        ax.bar(positions - 0.4 + width * (i + 0.5), table[column].to_numpy(),
+               width = width, color = colors[i], label = str(column))
+    ax.set_xticks(positions, [str(label) for label in table.index])
+    ax.set_xlim(-0.5, len(table) - 0.5)
+    ax.set_xlabel(table.index.name)
+    ax.set_ylabel('count')
+    ax.legend(title = legend_title)
+    return ax
+
+
+def percent_labels(ax, total, containers=None, fmt='%.1f%%', **kwargs):
+    """ label every bar of `containers` (all bars of ax by default) with its
+    percentage of `total`. The label strings are built in one vectorized step
+    per container and added with a single bar_label call """
+    if containers is None:
+        containers = ax.containers
+    kwargs.setdefault('size', 10)
+    for container in containers:
+        # the counts the bars were drawn from
+        counts = np.asarray(container.datavalues, dtype = float)
+        ax.bar_label(container, labels = np.char.mod(fmt, 100 * counts / total), **kwargs)
+    return ax
+
+
+def density_plot(x, y, ax=None, mode='heatmap', bins=100, color=color, cmap='Blues',
+                 alpha=None, x_jitter=0, y_jitter=0):
+    """ relationship of two numeric variables.
+    mode 'heatmap' draws the 2D counts of a bins x bins grid as one rasterized
+    mesh, 'hexbin' draws the same pre-binned counts as hexagons, and 'scatter'
+    draws every point (with optional jitter) like the original charts.
+    Only 'scatter' grows with the number of rows """
+    if ax is None:
+        ax = plt.gca()
+    x = np.asarray(x, dtype = float)
+    y = np.asarray(y, dtype = float)
+
+    if mode == 'scatter':
+        rng = np.random.default_rng()
+        if x_jitter:
+            x = x + rng.uniform(-x_jitter, x_jitter, len(x))
+        if y_jitter:
+            y = y + rng.uniform(-y_jitter, y_jitter, len(y))
+        return ax.scatter(x, y, color = color, alpha = alpha)
+
+    counts, xedges, yedges = bin2d(x, y, bins)
+    if mode == 'heatmap':
+        return ax.pcolormesh(xedges, yedges, np.ma.masked_equal(counts.T, 0), cmap = cmap,
+                             norm = mcolors.LogNorm(), rasterized = True)
+    if mode == 'hexbin':
+        xs, ys, weights = cell_centers(counts, xedges, yedges)
+        return ax.hexbin(xs, ys, C = weights, reduce_C_function = np.sum, gridsize = max(bins // 2, 1),
+                         extent = (xedges[0], xedges[-1], yedges[0], yedges[-1]), cmap = cmap, bins = 'log')
+    raise ValueError("mode must be 'heatmap', 'hexbin' or 'scatter', not {!r}".format(mode))
+
+
+def _category_order(df, column, exclude=()):
+    """ categories of a column in chart order: category order for categoricals,
+    sorted values otherwise """
+    values = df[column].cat.categories if hasattr(df[column], 'cat') else np.sort(df[column].dropna().unique())
+    return [value for value in values if value not in exclude]
+
+
+def sketch_boxes(digests, order, ax=None, color='lightblue'):
+    """ box plot (without fliers) of per-group quantile sketches, one box per
+    group of `order` """
+    if ax is None:
+        ax = plt.gca()
+    order = [key for key in order if key in digests]
+    ax.bxp([box_stats(digests[key], str(key)) for key in order], positions = np.arange(len(order)),
+           widths = 0.8, showfliers = False, patch_artist = True,
+           boxprops = {'facecolor': color}, medianprops = {'color': 'black'})
+    return ax
+
+
+def sketch_violins(stats, positions, ax=None, color='lightblue', width=0.8, inner='box',
+                   orientation='vertical'):
+    """ violins of precomputed density outlines (prosper.sketch.violin_stats or
+    prosper.kde.kde_violin_stats), with a box (inner='box') or dashed quartile
+    lines (inner='quartile') inside """
+    if ax is None:
+        ax = plt.gca()
+    parts = ax.violin(stats, positions, widths = width, showextrema = False, orientation = orientation)
+    for body in parts['bodies']:
+        body.set_facecolor(color)
+        body.set_edgecolor('dimgray')
+        body.set_alpha(1)
+
+    vertical = orientation == 'vertical'
+    for position, stat in zip(positions, stats):
+        q1, median, q3 = stat['quartiles']
+        if inner == 'box':
+            # the value axis runs along y for vertical violins
+            line = ax.vlines if vertical else ax.hlines
+            line(position, stat['min'], stat['max'], color = 'dimgray', linewidth = 1)
+            line(position, q1, q3, color = 'dimgray', linewidth = 5)
+            point = (position, median) if vertical else (median, position)
+            ax.plot(*point, 'o', color = 'white', markersize = 4)
+        elif inner == 'quartile':
+            half = np.interp(stat['quartiles'], stat['coords'], stat['vals']) / stat['vals'].max() * width / 2
+            line = ax.hlines if vertical else ax.vlines
+            for q, h, style in zip(stat['quartiles'], half, ['--', '-', '--']):
+                line(q, position - h, position + h, color = 'dimgray', linestyle = style, linewidth = 1)
+    return ax
+
+
+def kde_violinplot(df, x, y, ax=None, color='lightblue', inner='box', exclude=()):
+    """ violins of y for every category of x, all estimated in one batched KDE
+    on a shared grid (see prosper.kde) """
+    if ax is None:
+        ax = plt.gca()
+    kde = grouped_kde(df, x, y)
+    order = [key for key in _category_order(df, x, exclude) if key in kde.keys]
+    positions = np.arange(len(order))
+    sketch_violins([kde_violin_stats(kde, key) for key in order], positions, ax = ax,
+                   color = color, inner = inner)
+    ax.set_xticks(positions, [str(key) for key in order])
+    ax.set_xlabel(display_name(x))
+    ax.set_ylabel(y)
+    return ax
+
+
+@profiled('plot/date_cat')
+def date_cat(cube):
+    """ploting of bar charts to reveal how borrowers were 
+    listed by year, month, and day    
+    """
+    fig, ax = plt.subplots(nrows = 3, figsize = [12, 10])
+    fig.subplots_adjust(hspace=0.335, wspace=0.335)
+
+    count_bar(marginal(cube, 'ListingCreationYear'), ax = ax[0])
+    count_bar(marginal(cube, 'ListingCreationMonth'), ax = ax[1])
+    count_bar(marginal(cube, 'ListingCreationDay'), ax = ax[2])
+
+    ax[0].set_xlabel('Listing Years')
+    ax[0].set_title('Listings by Years', size = 15)
+    ax[1].set_xlabel('Listing Months')
+    ax[1].set_title('Listings by Months', size = 15, loc = 'left')
+    ax[2].set_xlabel('Listing Days')
+    ax[2].set_title('Listings by Days', size = 15, loc = 'left')
+    return fig
+
+
+@profiled('plot/state_cat')
+def state_cat(cube):
+    """ bar chart of borrowers by state, with the percentage on each bar """
+    fig = plt.figure(figsize = [20, 12])
+    type_counts = marginal(cube, 'State')
+    df_size = type_counts.sum()
+
+    count_bar(type_counts)
+    plt.xlabel('States', size = 12)
+    plt.title('Distribution of Borrowers by State', size = 15)
+
+    plt.xticks(rotation = 45, horizontalalignment='right', size = 12)
+
+    # Placing percentage value on each bar
+    percent_labels(plt.gca(), df_size, color = 'black')
+    return fig
+
+
+@profiled('plot/status_cat')
+def status_cat(cube):
+    """ploting of bar charts for income-category, and employment status    
+    """
+    fig, ax = plt.subplots(nrows = 2, figsize = [8, 10])
+    fig.subplots_adjust(hspace=0.335, wspace=0.335)
+
+    count_bar(marginal(cube, 'IncomeCategory'), ax = ax[0])
+    count_bar(marginal(cube, 'EmploymentStatus', exclude = ['Other']), ax = ax[1])
+
+    # Setting the axes labels and title
+    ax[0].set_xlabel('Income Category', size = 12)
+    ax[0].set_title('Income Category of Borrowers', size = 15)
+    ax[1].set_xlabel('Employment Status', size = 12)
+    ax[1].set_title('Borrowers Employment Status', size = 15, loc = 'left')
+    return fig
+
+
+@profiled('plot/rating_score')
+def rating_score(cube):
+    """ Prosper loan rate and score charts """
+    fig = plt.figure(figsize = (14,5))
+
+    plt.subplot(1,2,1)
+    count_bar(marginal(cube, 'ProsperRating (Alpha)'))
+    plt.xlabel('Rate')
+    plt.title("Prosper Borrowers' Rating", size = 15)
+
+    plt.subplot(1,2,2)
+    count_bar(marginal(cube, 'ProsperScore'))
+    plt.xlabel('Risk Score')
+    plt.title('Prosper Risk Score', size = 15)
+    return fig
+
+
+@profiled('plot/loan_term')
+def loan_term(cube):
+    """ doughnut chart of the loan terms """
+    loan_term = marginal(cube, 'Term').sort_values(ascending = False)
+
+    fig = plt.figure(figsize =(8,5))
+
+    plt.pie(loan_term, startangle = 190,
+            counterclock = True, wedgeprops = {'width':0.4, 'linewidth': .2})
+    plt.title('Loan Duration', size = 15)
+
+    labels = ['{} months  ({:.1%})'.format(term, count / loan_term.sum()) for term, count in loan_term.items()]
+    plt.legend(labels, bbox_to_anchor = (.85,.5), loc = 'center', bbox_transform = fig.transFigure,)
+    plt.gca().axis('equal')
+    return fig
+
+
+def hist_bars(hist, ax=None, color=color):
+    """ draw an accumulated Histogram like plt.hist would draw the raw values """
+    if ax is None:
+        ax = plt.gca()
+    ax.hist(hist.edges[:-1], bins = hist.edges, weights = hist.counts, color = color)
+    return ax
+
+
+@profiled('plot/monthly_income')
+def monthly_income(hists):
+    """ two histogram charts of stated monthly income: the first in $1k bins
+    without transformation, the second log transformed """
+    fig = plt.figure(figsize =(15,6))
+
+    plt.subplot(1,2,1)
+    hist_bars(hists['StatedMonthlyIncome:linear'])
+    plt.xlabel('Monthly Income ($)')
+    plt.ylabel('Count')
+    plt.title("Borrowers' Stated Monthly Income", size = 15)
+
+    plt.subplot(1,2,2)
+    hist_bars(hists['StatedMonthlyIncome'])
+    plt.xscale('log')
+    plt.xticks([10, 100, 1000, 10000, 100000, 1000000], ['10', '100', '1k', '10k', '100k', '1M'])
+    plt.xlabel('Monthly Income ($)')
+    plt.ylabel('Count')
+    plt.title("Borrowers' Stated Monthly Income (Log Transformed)", size = 12)
+    return fig
+
+
+@profiled('plot/loan_amount')
+def loan_amount(hists):
+    """ distribution of loan original amount on a log scale """
+    xticks = [500, 1000, 2000, 5000, 10000, 20000, 35000]
+    labels = ['{}'.format(k) for k in xticks]
+
+    fig = plt.figure(figsize =(8,4))
+    hist_bars(hists['LoanOriginalAmount'])
+    plt.xscale('log')
+    plt.xticks(xticks, labels)
+    plt.xlabel('Loan Original Amount ($)')
+    return fig
+
+
+@profiled('plot/amount_delinq')
+def amount_delinq(hists):
+    """ This function is to plot two histogram charts of amount delinquent.
+    The first chart is without transformation while the second chart is log
+    transformed"""
+
+    fig = plt.figure(figsize =(15,6))
+
+    plt.subplot(1,2,1)
+    hist_bars(hists['AmountDelinquent'])
+    plt.xlabel('Amount Delinquent ($)')
+    plt.title('Distribution of Amount Delinquent', size = 15)
+
+    plt.subplot(1,2,2)
+    hist_bars(hists['AmountDelinquent'])
+    plt.xscale('log')
+    plt.xticks([10, 100, 1000, 10000, 100000],['10', '100', '1k', '10k', '100k'])
+    plt.xlabel('Amount Delinquent ($)')
+    plt.title("Distribution of Amount Delinquent (Log Transformed)", size = 12)
+    return fig
+
+
+@profiled('plot/investors_hist')
+def investors_hist(hists):
+    """ distribution of investors on a log scale """
+    fig = plt.figure(figsize=[8, 6])
+    hist_bars(hists['Investors'], color = None)
+    plt.xscale('log')
+    plt.xticks([1, 1e1, 1e2, 1e3], ['1','10', '100', '1000'])
+    plt.title('Distribution of Investors (Log Transformed)', size = 15)
+    plt.xlabel('Number of Investors')
+    plt.ylabel('Count')
+    plt.xlim(0.5, 1e3)
+    return fig
+
+
+@profiled('plot/corr_heatmap')
+def corr_heatmap(corr):
+    """ heatmap chart to show correlation coefficients of variables, read from
+    a streaming prosper.correlation.Correlation """
+    fig = plt.figure(figsize=[10,6])
+    sb.heatmap(corr.corr(), annot = True,
+               fmt = '.3f',cmap = 'vlag_r', center =0)
+    return fig
+
+
+@profiled('plot/homeowner_cat')
+def homeowner_cat(cube):
+    """ bar charts for ProsperRating(Alpha) and IncomeCategory using
+    IsBorrowerHomeowner as hue, with the percent value on each bar """
+    fig = plt.figure(figsize=(15,5))
+
+    total = cube.total
+
+    for i, (var, label) in enumerate([('ProsperRating (Alpha)', 'Prosper Rating'),
+                                      ('IncomeCategory', 'Income Category')]):
+        plt.subplot(1, 2, i + 1)
+        ax = grouped_bar(crosstab(cube, var, 'IsBorrowerHomeowner'), legend_title = 'Home-Owner')
+        plt.xlabel(label)
+
+        # Labeling the bars with their percent value
+        percent_labels(ax, total)
+
+    plt.suptitle('Home-Owner by Prosper-Rating and Income-Category', size = 15)
+    return fig
+
+
+@profiled('plot/pair_grid')
+def pair_grid(df, numeric_vars=numeric_vars, mode='heatmap', bins=50):
+    """ pairwise analysis of the numeric variables: histograms on the diagonal
+    and density_plot (or every point, with mode='scatter') elsewhere """
+    n = len(numeric_vars)
+    fig, ax = plt.subplots(nrows = n, ncols = n, figsize = [2.5 * n, 2.5 * n], sharex = 'col')
+
+    for i, yvar in enumerate(numeric_vars):
+        for j, xvar in enumerate(numeric_vars):
+            if i == j:
+                counts, edges = np.histogram(df[xvar].dropna(), bins = 20)
+                ax[i, j].stairs(counts, edges, fill = True, color = color)
+            else:
+                density_plot(df[xvar], df[yvar], ax = ax[i, j], mode = mode, bins = bins)
+            ax[i, j].set_xlabel(xvar if i == n - 1 else '')
+            ax[i, j].set_ylabel(yvar if j == 0 else '')
+    fig.tight_layout()
+    return fig
+
+
+@profiled('plot/apr_rate')
+def apr_rate(df, mode='heatmap'):
+    """ relationship between 'BorrowerAPR' and 'BorrowerRate' """
+    fig = plt.figure(figsize = [8, 6])
+
+    density_plot(df['BorrowerAPR'], df['BorrowerRate'], mode = mode, alpha = 1/20)
+
+    plt.yticks([0.05, 0.10, 0.15, 0.20, 0.25, 0.30, 0.35],
+               ['5', '10', '15', '20', '25', '30', '35'])
+    plt.xticks([0.05, 0.10, 0.15, 0.20, 0.25, 0.35, 0.40],
+               ['5%','10%','15%','20%','25%','30%','40%'])
+    plt.xlabel('Borrower Annual Percentage Rate (APR)')
+    plt.ylabel('Borrower Rate')
+    plt.title('Borrower Annual % Rate and Borrower Rate Relationship')
+    return fig
+
+
+def regplot(df, x, y, ax=None, mode='heatmap', alpha=None, x_jitter=0, y_jitter=0,
+            ci=95, n_boot=None, sample_size=10_000, seed=None):
+    """ density_plot of y against x with the least-squares line and its
+    confidence band. The band is analytic unless n_boot is given, in which
+    case it comes from n_boot refits on `sample_size`-row resamples.
+    Returns the fit (slope, intercept, r, ...) """
+    if ax is None:
+        ax = plt.gca()
+    density_plot(df[x], df[y], ax = ax, mode = mode, alpha = alpha,
+                 x_jitter = x_jitter, y_jitter = y_jitter)
+
+    fit = fit_ols(df[x], df[y])
+    grid = np.linspace(np.nanmin(df[x]), np.nanmax(df[x]), 100)
+    if n_boot:
+        low, high = bootstrap_band(df[x], df[y], grid, ci = ci, n_boot = n_boot,
+                                   sample_size = sample_size, seed = seed)
+    else:
+        low, high = confidence_band(fit, grid, ci = ci)
+    ax.plot(grid, predict(fit, grid), color = color)
+    ax.fill_between(grid, low, high, color = color, alpha = 0.15, linewidth = 0)
+    return fit
+
+
+@profiled('plot/rate_amount')
+def rate_amount(df, mode='heatmap'):
+    """ relationship between borrower annual percentage rate, borrower rate
+    and loan original amount """
+    fig = plt.figure(figsize =[12,10])
+
+    plt.subplot(2,1,1)
+    regplot(df, 'LoanOriginalAmount', 'BorrowerAPR', mode = mode, alpha = 1/100)
+    plt.xlabel('Loan Original Amount')
+    plt.ylabel('Borrower Annual Percent Rate')
+    plt.title('Loan Original Amount and Borrower Annual % Rate Relationship')
+
+    plt.subplot(2,1,2)
+    regplot(df, 'LoanOriginalAmount', 'BorrowerRate', mode = mode, alpha = 1/100)
+    plt.xlabel('Loan Original Amount')
+    plt.ylabel('Borrower Rate')
+    plt.title('Loan Original Amount and Borrower Rate Relationship', loc = 'left')
+    return fig
+
+
+@profiled('plot/investors_relation')
+def investors_relation(df, mode='heatmap'):
+    """ investors and prosper score, investors and loan original amount relationships """
+    fig = plt.figure(figsize =[12,10])
+
+    plt.subplot(2,1,1)
+    regplot(df, 'Investors', 'ProsperScore', mode = mode, alpha = 1/10, x_jitter = 5, y_jitter = 2)
+    plt.xlabel('Investors')
+    plt.ylabel('Prosper score')
+    plt.title('Investors and Prosper Score Relationship')
+
+    plt.subplot(2,1,2)
+    regplot(df, 'Investors', 'LoanOriginalAmount', mode = mode, alpha = 1/100, x_jitter = 30, y_jitter = 10)
+    plt.xlabel('Investors')
+    plt.ylabel('Loan Original Amount')
+    plt.title('Investors and Loan Original Amount Relationship', loc = 'left')
+    return fig
+
+
+@profiled('plot/bor_box')
+def bor_box(df):
+    """ box plot charts for 'Income Category' by 'Prosper Score' and 'Borrower APR',
+    drawn from one quantile sketch per income category """
+    order = _category_order(df, 'IncomeCategory')
+    fig = plt.figure(figsize = [15, 5])
+
+    for i, (var, label) in enumerate([('ProsperScore', 'Prosper Score'), ('BorrowerAPR', 'Borrower APR')]):
+        plt.subplot(1, 2, i + 1)
+        ax = sketch_boxes(grouped_digests(df, 'IncomeCategory', var), order)
+        ax.set_xticks(np.arange(len(order)), order)
+        plt.xlabel('Income Category')
+        plt.ylabel(label)
+    plt.suptitle('Income Category by Prosper Score and Borrower APR', size = 15)
+    return fig
+
+
+@profiled('plot/loan_box')
+def loan_box(df):
+    """ violin plots of log loan amount and log investors by rating and income
+    category, one batched KDE per panel """
+    df = with_derived(df, ['Log_LoanOriginalAmount', 'Log_Investors'])
+    ordered_vars = ['ProsperRating (Alpha)','IncomeCategory']
+
+    fig, ax = plt.subplots(ncols = 2, nrows = 2, figsize =[12,8])
+
+    for i in range(len(ordered_vars)):
+        var = ordered_vars[i]
+        kde_violinplot(df, var, 'Log_LoanOriginalAmount', ax = ax[i,0])
+        ax[i,0].set_yticks(*log_ticks([500.0, 1.5e3, 3e3, 7.5e3, 1.5e4, 3e4, 4.5e4]))
+
+        kde_violinplot(df, var, 'Log_Investors', ax = ax[i,1])
+        ax[i,1].set_yticks(*log_ticks([ 1, 5, 15, 50, 200, 600, 1200],
+                                      ['1', '5', '15', '50', '200', '600', '1200']))
+    return fig
+
+
+@profiled('plot/state_investors')
+def state_investors(df):
+    """ distribution of investors accross all states, from one quantile sketch per state """
+    digests = grouped_digests(df, 'State', 'Investors')
+    order = [state for state in _category_order(df, 'State') if state in digests]
+    positions = np.arange(len(order))
+
+    fig = plt.figure(figsize = [20,20])
+    ax = sketch_violins([violin_stats(digests[state]) for state in order], positions,
+                        inner = 'quartile', orientation = 'horizontal')
+    ax.set_yticks(positions, order)
+    ax.set_ylim(len(order) - 0.5, -0.5)
+    plt.xlabel('Investors', size = 15)
+    plt.ylabel('States', size = 15)
+    plt.yticks(size = 12)
+    plt.xticks(size = 12)
+    plt.title('Distribution of Investors Accross States', size = 18)
+    return fig
+
+
+@profiled('plot/income_pointplots')
+def income_pointplots(df):
+    """Plot for showing relationships between IncomeCategory,
+    ProsperRating, StatedMonthlyIncome, LoanOriginalAmount and AmountDelinquent"""
+
+    fig = plt.figure(figsize = [10,18])
+
+    plt.subplot(3,1,1)
+    sb.pointplot(data = df, x = 'ProsperRating (Alpha)',
+                 y = 'StatedMonthlyIncome', hue = 'IncomeCategory',
+                  linestyles = "", dodge = 0.3, palette = 'Blues')
+    plt.xlabel('Prosper-Rating')
+    plt.ylabel('Monthly-Income')
+    plt.title('Income-Category by Prosper_Rating and Monthly-Income')
+
+    plt.subplot(3,1,2)
+    sb.pointplot(data = df, x = 'ProsperRating (Alpha)',
+                 y = 'LoanOriginalAmount', hue = 'IncomeCategory',
+                 dodge = 0.5, palette = 'Blues')
+    plt.xlabel('Prosper-Rating')
+    plt.ylabel('Loan Original Amount')
+    plt.title('Income-Category by Prosper_Rating and Loan-Amount')
+
+    plt.subplot(3,1,3)
+    sb.pointplot(data = df, x = 'ProsperRating (Alpha)',
+                 y = 'AmountDelinquent', hue = 'IncomeCategory',
+                 dodge = 0.3, palette = 'Blues')
+    plt.xlabel('Prosper-Rating')
+    plt.ylabel('Amount-Delinquent')
+    plt.title('Income-Category by Prosper_Rating and Amount-Delinquent')
+    return fig
+
+
+@profiled('plot/employment_term')
+def employment_term(df, index=None):
+    """ violin plot of loan original amount by employment status and term, with
+    every (status, term) density from one batched KDE. Given a prosper.query
+    LoanIndex of df, the 'Other' rows are dropped through it before the KDE """
+    if index is not None:
+        df = index.take(index.ne('EmploymentStatus', 'Other'), ['EmploymentStatus', 'Term', 'LoanOriginalAmount'])
+    kde = grouped_kde(df, ['EmploymentStatus', 'Term'], 'LoanOriginalAmount')
+    statuses = [status for status in _category_order(df, 'EmploymentStatus', exclude = ['Other'])
+                if any(key[0] == status for key in kde.keys)]
+    terms = _category_order(df, 'Term')
+    width = 0.8 / len(terms)
+    cycle = plt.rcParams['axes.prop_cycle'].by_key()['color']
+
+    fig = plt.figure(figsize =[10,8])
+    ax = plt.gca()
+    handles = []
+    for j, term in enumerate(terms):
+        keys = [(status, term) for status in statuses if (status, term) in kde.keys]
+        positions = [statuses.index(status) - 0.4 + width * (j + 0.5) for status, _ in keys]
+        if keys:
+            sketch_violins([kde_violin_stats(kde, key) for key in keys], positions, ax = ax,
+                           color = cycle[j % len(cycle)], width = width)
+        handles.append(mpatches.Patch(color = cycle[j % len(cycle)], label = str(term)))
+    ax.set_xticks(np.arange(len(statuses)), statuses)
+    ax.legend(handles = handles, title = 'Term')
+    plt.xlabel('Employment Status')
+    plt.ylabel('Loan Original Amount')
+    plt.title('Term by Employment-Status and Loan-Original-Amount')
+    return fig
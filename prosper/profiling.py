@@ -0,0 +1,255 @@
+"""Stage-level profiling of the analysis: wall and CPU time, rows and memory.
+
+The loader, every cleaning stage, the aggregates and every plotting function
+are marked as stages (the profiled decorator, or profiler.stage around a
+block). While the profiler is disabled, which is the default, a stage costs
+one attribute check. Enabled, each call records its wall and CPU time, the
+rows it was given and returned, its change in resident memory and, for the
+outermost stages, their peak resident memory. Stages named in `profile` are
+also run under cProfile (a .prof file per call) or under a sampling profiler
+whose stacks join the flame graph.
+
+    enable(profile = ['plot/loan_box'])
+    ...
+    profiler.summary()                       # one row per stage
+    profiler.write_collapsed('stages.folded')  # for flamegraph.pl / speedscope
+
+or, for the whole script, PROSPER_PROFILE=1 (and PROSPER_PROFILE_STAGES=a,b)
+writes both to prosper_profile/ when the interpreter exits.
+"""
+
+import atexit
+import contextlib
+import cProfile
+import functools
+import os
+import resource
+import sys
+import threading
+import time
+
+
+def _status_mb(field):
+    # VmRSS (current) or VmHWM (peak since the last reset) from /proc, None off Linux
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def _reset_peak():
+    # writing 5 to clear_refs resets VmHWM to the current RSS (Linux 4.0+)
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def _rows(value):
+    # rows of a frame, series or array; None for anything else (figures, dicts)
+    shape = getattr(value, 'shape', None)
+    return shape[0] if shape else None
+
+
+class _Sampler(threading.Thread):
+    # samples the stack of one thread every `interval` seconds, from the frame of
+    # the stage down, and adds the elapsed microseconds to each collapsed stack
+
+    def __init__(self, thread_id, top, interval):
+        super().__init__(daemon = True)
+        self.thread_id, self.top, self.interval = thread_id, top, interval
+        self.stacks = {}
+        self.done = threading.Event()
+
+    def run(self):
+        last = time.perf_counter()
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            names = []
+            while frame is not None and frame is not self.top:
+                code = frame.f_code
+                names.append('{} ({}:{})'.format(code.co_name, os.path.basename(code.co_filename),
+                                                code.co_firstlineno))
+                frame = frame.f_back
+            key = ';'.join(reversed(names))
+            self.stacks[key] = self.stacks.get(key, 0) + int((now - last) * 1e6)
+            last = now
+
+
+class Profiler:
+    """ collects one record per stage call while enabled. `profile` names the
+    stages to profile as well, with cProfile (mode='cprofile', .prof files in
+    out_dir) or the sampling profiler (mode='sample') """
+
+    def __init__(self):
+        self.enabled = False
+        self.profile = frozenset()
+        self.mode = 'sample'
+        self.interval = 0.005
+        self.out_dir = 'prosper_profile'
+        self.reset()
+
+    def reset(self):
+        self.records = []
+        self.samples = {}
+        # stage stacks per thread, so stages can run in a thread pool
+        self._stacks = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, data=None):
+        """ record the block as stage `name`; `data` is its input, for the row
+        count. Yields the record, whose 'rows_out' the block may set """
+        if not self.enabled:
+            yield {}
+            return
+
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        stack.append(name)
+        path = ';'.join(stack)
+        outermost = len(stack) == 1
+        # the peak is process-wide: only the main thread's stages reset it
+        main = threading.current_thread() is threading.main_thread()
+        per_stage_peak = outermost and main and _reset_peak()
+        record = {'stage': name, 'path': path, 'rows_in': _rows(data), 'rows_out': None}
+        rss = _status_mb('VmRSS')
+        sampler = profile = None
+        if name in self.profile:
+            if self.mode == 'cprofile':
+                profile = cProfile.Profile()
+            else:
+                sampler = _Sampler(threading.get_ident(), sys._getframe(2), self.interval)
+                sampler.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            if profile is not None:
+                profile.enable()
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record['wall_s'] = time.perf_counter() - wall
+            record['cpu_s'] = time.process_time() - cpu
+            after = _status_mb('VmRSS')
+            record['rss_delta_mb'] = None if rss is None else after - rss
+            record['peak_rss_mb'] = (_status_mb('VmHWM') if per_stage_peak else
+                                     _peak_rss_mb() if outermost and main else None)
+            if sampler is not None:
+                sampler.done.set()
+                sampler.join()
+                for sampled, micros in sampler.stacks.items():
+                    key = path + (';' + sampled if sampled else '')
+                    self.samples[key] = self.samples.get(key, 0) + micros
+                record['profile'] = 'sampled'
+            if profile is not None:
+                os.makedirs(self.out_dir, exist_ok = True)
+                record['profile'] = os.path.join(self.out_dir, '{}-{}.prof'.format(
+                    name.replace('/', '_'), len(self.records)))
+                profile.dump_stats(record['profile'])
+            self.records.append(record)
+            stack.pop()
+
+    def summary(self):
+        """ one row per stage: calls, total wall and CPU seconds, rows in and
+        out, memory growth and the highest peak, slowest first """
+        import pandas as pd
+
+        columns = ['stage', 'wall_s', 'cpu_s', 'rows_in', 'rows_out', 'rss_delta_mb', 'peak_rss_mb']
+        records = pd.DataFrame(self.records, columns = columns).astype({'rows_in': 'Int64', 'rows_out': 'Int64'})
+        # rows stay missing for stages that take or return something other than rows
+        rows = lambda values: values.sum(min_count = 1)
+        table = records.groupby('stage', sort = False).agg(
+            calls = ('wall_s', 'size'), wall_s = ('wall_s', 'sum'), cpu_s = ('cpu_s', 'sum'),
+            rows_in = ('rows_in', rows), rows_out = ('rows_out', rows),
+            rss_delta_mb = ('rss_delta_mb', 'sum'), peak_rss_mb = ('peak_rss_mb', 'max'))
+        return table.sort_values('wall_s', ascending = False).round(3)
+
+    def collapsed(self):
+        """ {stack: microseconds} of self time per stage path (stages nest with
+        ';'), with sampled stages broken down by their sampled stacks """
+        stacks = {}
+        for record in self.records:
+            stacks[record['path']] = stacks.get(record['path'], 0) + record['wall_s']
+            parent = record['path'].rpartition(';')[0]
+            if parent:
+                stacks[parent] = stacks.get(parent, 0) - record['wall_s']
+        micros = {path: int(seconds * 1e6) for path, seconds in stacks.items()}
+        for stack, value in self.samples.items():
+            path = stack.split(';')
+            # sampled time replaces the self time of the stage it was taken in
+            for depth in range(len(path), 0, -1):
+                if ';'.join(path[:depth]) in micros:
+                    micros[';'.join(path[:depth])] -= value
+                    break
+            micros[stack] = micros.get(stack, 0) + value
+        return {stack: value for stack, value in micros.items() if value > 0}
+
+    def write_collapsed(self, path):
+        """ collapsed stacks ('stage;sub;function microseconds' per line), the
+        input of flamegraph.pl, speedscope and similar viewers """
+        with open(path, 'w') as f:
+            for stack, value in sorted(self.collapsed().items()):
+                f.write('{} {}\n'.format(stack, value))
+
+    def write_report(self, out_dir=None):
+        """ summary.txt and stages.folded in out_dir (the profiler's out_dir by default) """
+        out_dir = self.out_dir if out_dir is None else out_dir
+        os.makedirs(out_dir, exist_ok = True)
+        with open(os.path.join(out_dir, 'summary.txt'), 'w') as f:
+            f.write(self.summary().to_string() + '\n')
+        self.write_collapsed(os.path.join(out_dir, 'stages.folded'))
+        return out_dir
+
+
+profiler = Profiler()
+
+
+def enable(profile=(), mode='sample', interval=0.005, out_dir='prosper_profile'):
+    """ start recording stages (clearing earlier records). Stages named in
+    profile are also profiled, by cProfile (mode='cprofile') or by sampling
+    every `interval` seconds (mode='sample') """
+    if mode not in ('sample', 'cprofile'):
+        raise ValueError("mode must be 'sample' or 'cprofile', not {!r}".format(mode))
+    profiler.reset()
+    profiler.profile = frozenset(profile)
+    profiler.mode, profiler.interval, profiler.out_dir = mode, interval, out_dir
+    profiler.enabled = True
+    return profiler
+
+
+def disable():
+    profiler.enabled = False
+    return profiler
+
+
+def profiled(name):
+    """ decorator marking a function as stage `name`; its first argument is
+    the stage's input and its return value the output """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.stage(name, args[0] if args else None) as record:
+                result = func(*args, **kwargs)
+                record['rows_out'] = _rows(result)
+            return result
+        return wrapper
+    return decorate
+
+
+if os.environ.get('PROSPER_PROFILE'):
+    enable([name for name in os.environ.get('PROSPER_PROFILE_STAGES', '').split(',') if name],
+           os.environ.get('PROSPER_PROFILE_MODE', 'sample'))
+    atexit.register(profiler.write_report)
@@ -0,0 +1,127 @@
+"""Rendering every chart of the analysis as files, in parallel and without Jupyter.
+
+The parent process builds the count cube, histograms and correlation the
+figures need once and hands them to every worker as it starts. When a
+figure drawn from the loans themselves is requested, each worker also loads
+the cleaned feather file memory-mapped, so the operating system shares its
+pages read-only between workers. Workers render the figures they are given
+on the Agg backend.
+
+    python -m prosper.report --data prosper_loan.feather --out figures --format png svg
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from prosper.store import default_path, load_clean
+
+
+# plotting function -> what it is drawn from (the cleaned 'loans', their count 'cube',
+# their 'hists' or their 'corr' accumulator), in report order. Functions are named
+# rather than imported so the parent process never loads matplotlib
+figures = {'date_cat': 'cube',
+           'state_cat': 'cube',
+           'status_cat': 'cube',
+           'loan_term': 'cube',
+           'rating_score': 'cube',
+           'monthly_income': 'hists',
+           'loan_amount': 'hists',
+           'amount_delinq': 'hists',
+           'investors_hist': 'hists',
+           'corr_heatmap': 'corr',
+           'pair_grid': 'loans',
+           'apr_rate': 'loans',
+           'rate_amount': 'loans',
+           'investors_relation': 'loans',
+           'bor_box': 'loans',
+           'loan_box': 'loans',
+           'homeowner_cat': 'cube',
+           'state_investors': 'loans',
+           'income_pointplots': 'loans',
+           'employment_term': 'loans'}
+
+_inputs = {}
+
+
+def figure_inputs(df, sources=('cube', 'hists', 'corr')):
+    """ {source: aggregate} of the cleaned loans for the figures drawn from
+    aggregates: the count 'cube', the 'hists' and the 'corr' accumulator """
+    from prosper.aggregate import count_cube
+    from prosper.correlation import Correlation
+    from prosper.histogram import loan_histograms
+    from prosper.plotting import numeric_vars
+
+    build = {'cube': count_cube, 'hists': loan_histograms,
+             'corr': lambda df: Correlation(numeric_vars).update(df)}
+    return {source: build[source](df) for source in sources}
+
+
+def _init_worker(data_path, aggregates):
+    import matplotlib
+    matplotlib.use('Agg')
+
+    _inputs.update(aggregates)
+    if data_path is not None:
+        _inputs['loans'] = load_clean(data_path)
+
+
+def _render(name, out_dir, formats):
+    import matplotlib.pyplot as plt
+
+    from prosper import plotting
+
+    start = time.perf_counter()
+    fig = getattr(plotting, name)(_inputs[figures[name]])
+    paths = []
+    for fmt in formats:
+        paths.append(os.path.join(out_dir, '{}.{}'.format(name, fmt)))
+        fig.savefig(paths[-1], bbox_inches = 'tight')
+    plt.close(fig)
+    return name, paths, time.perf_counter() - start
+
+
+def render_all(data_path=default_path, out_dir='figures', formats=('png', 'svg'), names=None, workers=None):
+    """ render the figures in `names` (all of them by default) to out_dir in
+    a pool of `workers` processes (one per core by default).
+    Returns {name: (paths, seconds)} """
+    names = list(figures if names is None else names)
+    unknown = set(names) - set(figures)
+    if unknown:
+        raise ValueError('unknown figures: {}'.format(', '.join(sorted(unknown))))
+    os.makedirs(out_dir, exist_ok = True)
+    sources = {figures[name] for name in names}
+    needed = sorted(sources - {'loans'})
+    aggregates = figure_inputs(load_clean(data_path), needed) if needed else {}
+    # workers load the loans only for the figures drawn from them
+    loans_path = os.fspath(data_path) if 'loans' in sources else None
+
+    results = {}
+    with ProcessPoolExecutor(max_workers = workers, initializer = _init_worker,
+                             initargs = (loans_path, aggregates)) as pool:
+        futures = [pool.submit(_render, name, out_dir, tuple(formats)) for name in names]
+        for future in as_completed(futures):
+            name, paths, seconds = future.result()
+            results[name] = (paths, seconds)
+    return {name: results[name] for name in names}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--data', default = default_path, help = 'cleaned feather or parquet file')
+    parser.add_argument('--out', default = 'figures', help = 'output directory')
+    parser.add_argument('--format', nargs = '+', default = ['png', 'svg'], dest = 'formats')
+    parser.add_argument('--only', nargs = '+', choices = list(figures), help = 'figures to render')
+    parser.add_argument('--workers', type = int, default = None, help = 'processes (default: one per core)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = render_all(args.data, args.out, args.formats, args.only, args.workers)
+    for name, (paths, seconds) in results.items():
+        print('{:<20} {:6.2f}s  {}'.format(name, seconds, ' '.join(paths)))
+    print('{} figures in {:.2f}s'.format(len(results), time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""The codebook of the categorical columns: every category defined once.
+
+A Codebook gives a cleaned column its source column, the mapping from source
+values to labels, the labels in chart order, whether that order is meaningful
+and the name charts show for it. encode() turns a source column into the
+column's categorical by remapping the integer codes of its categories, so a
+lookup such as state code -> state name runs once per category (51 of them)
+rather than once per row, and the result has its final dtype straight away.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+# change incomeRange values to a qualitative or descriptive category
+category = {'$0':'No-income', '$1-24,999':'Very-low',
+            '$25,000-49,999':'Low','$50,000-74,999':'Average',
+            '$75,000-99,999':'High', '$100,000+':'Very-high'}
+
+states = {
+    'AK':'Alaska',
+    'AL':'Alabama',
+    'AR':'Arkansas',
+    'AZ':'Arizona',
+    'CA':'California',
+    'CO':'Colorado',
+    'CT':'Connecticut',
+    'DC':'District of Columbia',
+    'DE':'Delaware',
+    'FL':'Florida',
+    'GA':'Georgia',
+    'HI':'Hawaii',
+    'IA':'Iowa',
+    'ID':'Idaho',
+    'IL':'Illinois',
+    'IN':'Indiana',
+    'KS':'Kansas',
+    'KY':'Kentucky',
+    'LA':'Louisiana',
+    'MA':'Massachusetts',
+    'MD':'Maryland',
+    'ME':'Maine',
+    'MI':'Michigan',
+    'MN':'Minnesota',
+    'MO':'Missouri',
+    'MS':'Mississippi',
+    'MT':'Montana',
+    'NC':'North Carolina',
+    'ND':'North Dakota',
+    'NE':'Nebraska',
+    'NH':'New Hampshire',
+    'NJ':'New Jersey',
+    'NM':'New Mexico',
+    'NV':'Nevada',
+    'NY':'New York',
+    'OH':'Ohio',
+    'OK':'Oklahoma',
+    'OR':'Oregon',
+    'PA':'Pennsylvania',
+    'RI':'Rhode Island',
+    'SC':'South Carolina',
+    'SD':'South Dakota',
+    'TN':'Tennessee',
+    'TX':'Texas',
+    'UT':'Utah',
+    'VA':'Virginia',
+    'VT':'Vermont',
+    'WA':'Washington',
+    'WI':'Wisconsin',
+    'WV':'West Virginia',
+    'WY':'Wyoming'
+}
+
+order = {'ProsperRating (Alpha)':['HR', 'E', 'D', 'C', 'B', 'A', 'AA'],
+         'IncomeCategory':['No-income','Very-low','Low','Average', 'High','Very-high'],
+        'ListingCreationDay':['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'],
+        'ListingCreationMonth':['January','February','March','April','May','June','July','August',
+                                'September','October','November','December']}
+
+
+# name: cleaned column, source: column it is encoded from, mapping: source value ->
+# label (None keeps the values), labels: categories in chart order, display: axis title
+Codebook = namedtuple('Codebook', ['name', 'source', 'mapping', 'labels', 'ordered', 'display'])
+
+codebooks = {'State': Codebook('State', 'BorrowerState', states, list(states.values()), False, 'States'),
+             'IncomeCategory': Codebook('IncomeCategory', 'IncomeRange', category, order['IncomeCategory'],
+                                        True, 'Income Category'),
+             'ProsperRating (Alpha)': Codebook('ProsperRating (Alpha)', 'ProsperRating (Alpha)', None,
+                                               order['ProsperRating (Alpha)'], True, 'Prosper Rating'),
+             'ListingCreationDay': Codebook('ListingCreationDay', 'ListingCreationDay', None,
+                                            order['ListingCreationDay'], True, 'Day'),
+             'ListingCreationMonth': Codebook('ListingCreationMonth', 'ListingCreationMonth', None,
+                                              order['ListingCreationMonth'], True, 'Month')}
+
+
+# storage dtypes of the cleaned columns: the smallest that hold the Prosper
+# values (Term 12/36/60, at most ~1,200 investors and ~2,700 days delinquent).
+# Floats keep 7 significant digits, strings are dictionary-encoded
+compact_dtypes = {'Term': 'int8',
+                  'ListingCategory (numeric)': 'int8',
+                  'Recommendations': 'int8',
+                  'Investors': 'int16',
+                  'LoanCurrentDaysDelinquent': 'int16',
+                  'ListingCreationYear': 'int16',
+                  'LoanOriginalAmount': 'int32',
+                  'BorrowerAPR': 'float32',
+                  'BorrowerRate': 'float32',
+                  'ProsperScore': 'float32',
+                  'AmountDelinquent': 'float32',
+                  'StatedMonthlyIncome': 'float32',
+                  'IsBorrowerHomeowner': 'bool',
+                  'LoanStatus': 'category',
+                  'Occupation': 'category',
+                  'EmploymentStatus': 'category',
+                  'BorrowerState': 'category',
+                  'IncomeRange': 'category'}
+
+
+def dtype(book):
+    """ the categorical dtype of a codebook's column """
+    return pd.CategoricalDtype(book.labels, ordered = book.ordered)
+
+
+def display_name(column):
+    """ axis title of a column: its codebook's display name, or the column name """
+    return codebooks[column].display if column in codebooks else column
+
+
+def remap_categories(series, mapping, categories=None, ordered=False):
+    """ categorical of `series` with every category replaced through `mapping`
+    (values it does not mention are kept, values mapped to None become
+    missing). Only the category -> new category lookup is computed; the rows
+    are moved with one take on their codes. categories fixes the resulting
+    categories (values outside them become missing); by default they are the
+    mapped categories in their original order """
+    values = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    old = values.cat.categories
+    new = [mapping.get(value, value) for value in old]
+    if categories is None:
+        categories = pd.unique(pd.Series([value for value in new if value is not None], dtype = object))
+    target = pd.CategoricalDtype(categories, ordered = ordered)
+
+    lookup = target.categories.get_indexer(pd.Index(new, dtype = object))
+    # code -1 (missing) picks the trailing -1
+    codes = np.append(lookup, -1)[values.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, dtype = target), index = series.index, name = series.name)
+
+
+def encode(series, book):
+    """ the codebook's categorical of a source column (categorical or not),
+    labels looked up per category. A column that already has the codebook's
+    dtype is returned as it is """
+    if series.dtype == dtype(book):
+        return series
+    return remap_categories(series, book.mapping or {}, book.labels, book.ordered)
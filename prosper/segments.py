@@ -0,0 +1,132 @@
+"""The analysis per segment: every year, state and employment status at once.
+
+The cleaned loans are partitioned once per segment dimension with groupby
+indices (row positions, no sub-frames). The count cubes, histograms and
+correlation matrices of all segments come out of one pass over the rows,
+and the row-level regression fits are fanned out to a pool of workers that
+memory-map the cleaned file. The results land in a SegmentResults store keyed
+by (dimension, segment) whose entries the plotting functions take as they
+take the full-data ones:
+
+    results = run_segments('prosper_loan.feather')
+    date_cat(results['State', 'California']['cube'])
+    corr_heatmap(results['ListingCreationYear', 2013]['corr'])
+
+    python -m prosper.segments --data prosper_loan.feather --out prosper_segments.pkl
+"""
+
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from prosper.aggregate import grouped_cubes
+from prosper.correlation import segment_correlations
+from prosper.histogram import grouped_histograms
+from prosper.store import default_path, load_clean
+
+
+segment_dims = ['ListingCreationYear', 'State', 'EmploymentStatus']
+
+# the fitted lines of the bivariate questions
+regression_pairs = [('LoanOriginalAmount', 'BorrowerAPR'), ('LoanOriginalAmount', 'BorrowerRate'),
+                    ('Investors', 'ProsperScore'), ('Investors', 'LoanOriginalAmount')]
+
+
+class SegmentResults:
+    """ results of the analysis keyed by (dimension, segment); each entry is a
+    dict of 'count', 'cube', 'hists', 'corr' and 'regression'. `positions`
+    keeps every segment's row positions in the cleaned file at data_path """
+
+    def __init__(self, data_path=default_path):
+        self.data_path = os.fspath(data_path)
+        self.results = {}
+        self.positions = {}
+
+    def __getitem__(self, key):
+        return self.results[key]
+
+    def __contains__(self, key):
+        return key in self.results
+
+    def __len__(self):
+        return len(self.results)
+
+    def keys(self, dim=None):
+        """ (dimension, segment) keys, only those of `dim` when it is given """
+        return [key for key in self.results if dim is None or key[0] == dim]
+
+    def get(self, dim, segment, source):
+        return self.results[dim, segment][source]
+
+    def loans(self, dim, segment, columns=None):
+        """ the cleaned loans of one segment, for the charts drawn from rows """
+        return load_clean(self.data_path, columns).take(self.positions[dim, segment])
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+_loans = {}
+
+
+def _init_worker(data_path):
+    columns = sorted({column for pair in regression_pairs for column in pair})
+    _loans['df'] = load_clean(data_path, columns)
+
+
+def _regressions(key, positions):
+    from prosper.regression import regression_summary
+    return key, regression_summary(_loans['df'].take(positions), regression_pairs)
+
+
+def run_segments(data_path=default_path, dims=segment_dims, workers=None):
+    """ the analysis for every segment of every dimension in `dims`: the cube,
+    histograms and correlations in one pass, the regressions in a pool of
+    `workers` processes (one per core by default). Returns a SegmentResults """
+    from prosper.plotting import numeric_vars
+
+    df = load_clean(data_path)
+    results = SegmentResults(data_path)
+    for dim in dims:
+        cubes = grouped_cubes(df, dim)
+        hists = grouped_histograms(df, dim)
+        corrs = segment_correlations(df, dim, numeric_vars)
+        for segment, positions in df.groupby(dim, observed = True, sort = True).indices.items():
+            results.positions[dim, segment] = positions
+            results.results[dim, segment] = {'count': len(positions),
+                                             'cube': cubes[segment],
+                                             'hists': hists[segment], 'corr': corrs[segment]}
+
+    with ProcessPoolExecutor(max_workers = workers, initializer = _init_worker,
+                             initargs = (results.data_path,)) as pool:
+        for key, summary in pool.map(_regressions, results.positions, results.positions.values()):
+            results.results[key]['regression'] = summary
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--data', default = default_path, help = 'cleaned feather or parquet file')
+    parser.add_argument('--out', default = 'prosper_segments.pkl', help = 'where to save the results')
+    parser.add_argument('--dims', nargs = '+', default = segment_dims, help = 'segment dimensions')
+    parser.add_argument('--workers', type = int, default = None, help = 'processes (default: one per core)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_segments(args.data, args.dims, args.workers)
+    results.save(args.out)
+    for dim in args.dims:
+        print('{:<20} {:4d} segments'.format(dim, len(results.keys(dim))))
+    print('{} segments in {:.2f}s, saved to {}'.format(len(results), time.perf_counter() - start, args.out))
+
+
+if __name__ == '__main__':
+    main()
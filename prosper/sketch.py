@@ -0,0 +1,171 @@
+"""Mergeable quantile sketches (t-digest) for the box and violin charts.
+
+A TDigest summarises a column in a few hundred weighted centroids, kept small
+at the tails so extreme quantiles stay accurate. Digests built on separate
+chunks, groups or workers merge into a digest of the combined data, and
+quantiles, the CDF and a density outline all come from the centroids.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class TDigest:
+    """ t-digest with the arcsine scale function. `compression` bounds the
+    number of centroids (about compression / 2 after compressing) and sets the
+    accuracy: the rank error is of order 1 / compression, smaller at the tails """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        """ add a batch of values (missing values are skipped); returns self """
+        values = np.asarray(values, dtype = float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._merge(values, np.ones(len(values)))
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+        return self
+
+    def merge(self, other):
+        """ fold another digest into this one; returns self """
+        if len(other.means):
+            self._merge(other.means, other.weights)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    def __add__(self, other):
+        return self.copy().merge(other)
+
+    def copy(self):
+        digest = TDigest(self.compression)
+        digest.means, digest.weights = self.means.copy(), self.weights.copy()
+        digest.min, digest.max = self.min, self.max
+        return digest
+
+    def _merge(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind = 'stable')
+        means, weights = means[order], weights[order]
+
+        # every point joins the centroid of the unit interval of the scale
+        # function k(q) = compression / (2 pi) * asin(2q - 1) it starts in
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights) / total
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1)))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def _knots(self):
+        # cumulative weight at each centroid's middle, pinned to min and max
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return np.r_[0, centers, self.count], np.r_[self.min, self.means, self.max]
+
+    def quantile(self, q):
+        """ estimated value at quantile(s) q in [0, 1] """
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan)
+        ranks, values = self._knots()
+        return np.interp(np.asarray(q, dtype = float) * self.count, ranks, values)
+
+    def cdf(self, x):
+        """ estimated fraction of values <= x """
+        if not len(self.means):
+            return np.full(np.shape(x), np.nan)
+        ranks, values = self._knots()
+        return np.interp(x, values, ranks) / self.count
+
+    def mid_cdf(self, x):
+        """ estimated fraction of values below x plus half of those equal to it,
+        the rank scale of Spearman's correlation. Values repeated across
+        several centroids (discrete columns) get the middle of their span """
+        if not len(self.means):
+            return np.full(np.shape(x), np.nan)
+        ranks, values = self._knots()
+        values, first, repeats = np.unique(values, return_index = True, return_counts = True)
+        low = np.interp(x, values, ranks[first])
+        high = np.interp(x, values, ranks[first + repeats - 1])
+        return (low + high) / 2 / self.count
+
+    def mean(self):
+        return float(self.means @ self.weights / self.count)
+
+    def std(self):
+        return float(np.sqrt(((self.means - self.mean()) ** 2) @ self.weights / self.count))
+
+
+def grouped_digests(df, by, column, compression=200):
+    """ {group: TDigest of `column`} for every group of `by` (a column name or a
+    list of them), built in one pass: the rows are sorted by group and value
+    once and each group's sorted run is compressed directly """
+    keys = [by] if isinstance(by, str) else list(by)
+    values = df[column].to_numpy(dtype = float, na_value = np.nan)
+    codes, uniques = pd.MultiIndex.from_frame(df[keys]).factorize() if len(keys) > 1 else pd.factorize(df[keys[0]])
+
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    bounds = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1], True])
+
+    digests = {}
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        digests[uniques[codes[start]]] = TDigest(compression).update(values[start:stop])
+    return digests
+
+
+def merge_grouped(*parts):
+    """ merge dicts of per-group digests from different chunks or workers """
+    merged = {}
+    for part in parts:
+        for key, digest in part.items():
+            merged[key] = merged[key].merge(digest) if key in merged else digest.copy()
+    return merged
+
+
+def box_stats(digest, label=None, whis=1.5):
+    """ statistics of one box for ax.bxp: quartiles from the digest, whiskers at
+    the last value within whis * IQR of the box (estimated by the fence,
+    clipped to the data range) and no fliers """
+    q1, med, q3 = digest.quantile([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    return {'label': label, 'med': med, 'q1': q1, 'q3': q3, 'mean': digest.mean(),
+            'whislo': max(digest.min, q1 - whis * iqr), 'whishi': min(digest.max, q3 + whis * iqr),
+            'fliers': []}
+
+
+def violin_stats(digest, points=100, bw=None):
+    """ statistics of one violin for ax.violin: a density outline taken from
+    the digest's CDF on `points` grid points, smoothed with a Gaussian of
+    width bw (Scott's rule on the digest's spread by default) """
+    edges = np.linspace(digest.min, digest.max, points + 1)
+    coords = (edges[:-1] + edges[1:]) / 2
+    step = edges[1] - edges[0]
+
+    if step > 0:
+        density = np.diff(digest.cdf(edges)) / step
+        if bw is None:
+            bw = 1.06 * digest.std() * digest.count ** (-1 / 5)
+        if bw > 0:
+            offsets = np.arange(-np.ceil(3 * bw / step), np.ceil(3 * bw / step) + 1) * step
+            kernel = np.exp(-0.5 * (offsets / bw) ** 2)
+            density = np.convolve(density, kernel / kernel.sum(), mode = 'same')
+    else:
+        density = np.ones(points)
+
+    return {'coords': coords, 'vals': density, 'mean': digest.mean(),
+            'median': float(digest.quantile(0.5)), 'min': digest.min, 'max': digest.max,
+            'quartiles': digest.quantile([0.25, 0.5, 0.75])}
@@ -0,0 +1,56 @@
+"""Persisting the cleaned loan dataframe as a columnar file.
+
+Feather (Arrow IPC) files are written uncompressed so they can be memory-mapped
+and read back without copying; Parquet is used when the path ends in .parquet.
+Both keep ordered categoricals and datetimes, so nothing is re-parsed or
+re-categorized on load. A directory of such files (the parts written by
+prosper.incremental) loads as one dataframe.
+"""
+
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from prosper.profiling import profiled
+
+
+default_path = 'prosper_loan.feather'
+
+
+def _is_parquet(path):
+    return os.fspath(path).endswith(('.parquet', '.pq'))
+
+
+@profiled('save_clean')
+def save_clean(df, path=default_path):
+    """ write the cleaned dataframe; the row index is dropped like the
+    original to_csv(index = False) """
+    table = pa.Table.from_pandas(df.reset_index(drop = True), preserve_index = False)
+    if _is_parquet(path):
+        pq.write_table(table, path)
+    else:
+        feather.write_feather(table, path, compression = 'uncompressed')
+    return path
+
+
+def read_table(path=default_path, columns=None):
+    """ the stored artifact as an arrow table, memory-mapped where the format
+    allows. A directory is read as the concatenation of its feather and
+    Parquet parts, in name order """
+    if os.path.isdir(path):
+        parts = sorted(name for name in os.listdir(path) if name.endswith(('.feather', '.parquet', '.pq')))
+        # a part whose values outgrew a compact dtype is promoted to the wider type
+        return pa.concat_tables([read_table(os.path.join(path, name), columns) for name in parts],
+                                promote_options = 'permissive')
+    if _is_parquet(path):
+        return pq.read_table(path, columns = columns, memory_map = True)
+    return feather.read_table(path, columns = columns, memory_map = True)
+
+
+@profiled('load_clean')
+def load_clean(path=default_path, columns=None):
+    """ load the cleaned dataframe. split_blocks keeps each column as its own
+    block so numeric columns of a memory-mapped feather file are not copied """
+    return read_table(path, columns).to_pandas(split_blocks = True)
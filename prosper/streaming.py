@@ -0,0 +1,64 @@
+"""Cleaning loan exports that do not fit in memory.
+
+The csv is read in chunks and every chunk goes through the same cleaning
+stages as the in-memory path. Each cleaned chunk is appended as a row group to
+a Parquet file per listing year, laid out as ListingCreationYear=<year>/ under
+the output directory, so memory stays bounded by the chunk size whatever the
+size of the export.
+"""
+
+import os
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from prosper import cleaning
+from prosper.loader import load_loans
+
+
+partition_column = 'ListingCreationYear'
+
+
+def clean_chunked(path='prosperLoanData.csv', out_dir='prosper_loan_parts',
+                  chunksize=100_000, stages=cleaning.stages):
+    """ clean `path` chunk by chunk into a year-partitioned Parquet dataset.
+    The original row number is kept as the index so read_partitioned can
+    restore the row order. Returns the number of rows written """
+    writers = {}
+    schema = None
+    rows = 0
+    try:
+        for chunk in load_loans(path, chunksize = chunksize):
+            chunk = cleaning.clean(chunk, stages)
+            if chunk.empty:
+                continue
+
+            table = pa.Table.from_pandas(chunk, preserve_index = True)
+            # categories inferred per chunk can give differently sized dictionary
+            # indices; the first chunk fixes the schema of every file
+            if schema is None:
+                schema = table.schema
+            else:
+                table = table.cast(schema)
+
+            years = chunk[partition_column].to_numpy()
+            for year in sorted(set(years)):
+                if year not in writers:
+                    directory = os.path.join(out_dir, '{}={}'.format(partition_column, year))
+                    os.makedirs(directory, exist_ok = True)
+                    writers[year] = pq.ParquetWriter(os.path.join(directory, 'part-0.parquet'), schema)
+                writers[year].write_table(table.filter(pa.array(years == year)))
+            rows += len(chunk)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return rows
+
+
+def read_partitioned(out_dir='prosper_loan_parts', columns=None, filter=None):
+    """ read a dataset written by clean_chunked back in original row order.
+    `filter` is a pyarrow dataset expression, e.g.
+    ds.field('ListingCreationYear') >= 2012 """
+    dataset = ds.dataset(out_dir, format = 'parquet')
+    return dataset.to_table(columns = columns, filter = filter).to_pandas(split_blocks = True).sort_index()
@@ -0,0 +1,394 @@
+"""Synthetic loans with the schema and the distributions of the Prosper export.
+
+No borrower record goes into the generator, only a model of aggregate shape: the
+share of each category (rating, term, state, employment, income range, ...),
+the shape of each numeric column, when values go missing, and the correlation
+of the numeric columns. The numeric columns are drawn together through a
+Gaussian copula so correlations like BorrowerAPR ~ BorrowerRate (0.99) or
+LoanOriginalAmount ~ Term (0.34) carry over. default_model holds the figures
+the notebook reports (null counts, income ranges, the leading states, the
+correlations) and typical values of the export elsewhere; fit_model refits it
+from the aggregates the analysis already builds (count cube, histograms,
+correlation accumulator).
+
+Rows are generated a chunk at a time with numpy only and written through
+pyarrow, so tens of millions of rows take minutes:
+
+    python -m prosper.synth --rows 20000000 --out synthetic.parquet
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from prosper.loader import selected_variables
+from prosper.schema import order, states
+
+
+# share tables are {'values': [...], 'weights': [...]} so the model stays plain json
+def _shares(table):
+    return {'values': list(table), 'weights': list(table.values())}
+
+
+default_model = {
+    'listing_dates': ['2005-11-09', '2014-03-10'],
+    # ProsperRating and ProsperScore only exist for listings from July 2009 on
+    'rating_start': '2009-07-01',
+    'shares': {
+        'ListingCreationYear': _shares({2005: 22, 2006: 6213, 2007: 11557, 2008: 11263, 2009: 2206,
+                                        2010: 5530, 2011: 11442, 2012: 19556, 2013: 35413, 2014: 10734}),
+        'ListingCreationMonth': _shares(dict(zip(order['ListingCreationMonth'],
+                                                 [11214, 10124, 9032, 7653, 8641, 8676, 9202, 9328, 9297,
+                                                  10539, 10233, 9998]))),
+        'ListingCreationDay': _shares(dict(zip(order['ListingCreationDay'],
+                                               [18500, 18300, 17600, 17200, 16300, 12800, 13200]))),
+        'BorrowerState': _shares({'CA': 12.7, 'NY': 6.9, 'TX': 6.6, 'FL': 6.4, 'IL': 5.0, 'GA': 4.5, 'OH': 3.9,
+                                  'MI': 3.3, 'VA': 3.2, 'NJ': 3.2, 'NC': 3.2, 'PA': 2.9, 'MD': 2.7, 'WA': 2.7,
+                                  'MO': 2.3, 'MN': 2.2, 'MA': 2.2, 'CO': 2.1, 'CT': 1.8, 'IN': 1.8, 'WI': 1.8,
+                                  'AZ': 1.6, 'AL': 1.6, 'TN': 1.5, 'OR': 1.3, 'NV': 1.2, 'SC': 1.0, 'KY': 0.9,
+                                  'KS': 0.9, 'LA': 0.9, 'OK': 0.8, 'UT': 0.8, 'AR': 0.7, 'MS': 0.7, 'NE': 0.5,
+                                  'NH': 0.5, 'ID': 0.5, 'NM': 0.4, 'RI': 0.4, 'WV': 0.4, 'HI': 0.4, 'DC': 0.3,
+                                  'DE': 0.3, 'MT': 0.3, 'IA': 0.2, 'AK': 0.2, 'SD': 0.2, 'VT': 0.2, 'ME': 0.1,
+                                  'ND': 0.1, 'WY': 0.1}),
+        'Term': _shares({12: 1614, 36: 87778, 60: 24545}),
+        'ProsperRating (Alpha)': _shares({'HR': 6935, 'E': 9795, 'D': 14274, 'C': 18345, 'B': 15581,
+                                          'A': 14551, 'AA': 5372}),
+        'ProsperScore': _shares({1: 992, 2: 5766, 3: 7642, 4: 12595, 5: 9813, 6: 12278, 7: 10597, 8: 12053,
+                                 9: 6911, 10: 4750, 11: 1456}),
+        'EmploymentStatus': _shares({'Employed': 67322, 'Full-time': 26355, 'Self-employed': 6134,
+                                     'Not available': 5347, 'Other': 3806, 'Part-time': 1088, 'Retired': 795}),
+        'IncomeRange': _shares({'$0': 621, '$1-24,999': 7274, '$25,000-49,999': 32192, '$50,000-74,999': 31050,
+                                '$75,000-99,999': 16916, '$100,000+': 17337, 'Not displayed': 7741,
+                                'Not employed': 806}),
+        'LoanStatus': _shares({'Current': 56576, 'Completed': 38074, 'Chargedoff': 11992, 'Defaulted': 5018,
+                               'Past Due (1-15 days)': 806, 'Past Due (16-30 days)': 265,
+                               'Past Due (31-60 days)': 363, 'Past Due (61-90 days)': 313,
+                               'Past Due (91-120 days)': 304, 'Past Due (>120 days)': 16,
+                               'FinalPaymentInProgress': 205, 'Cancelled': 5}),
+        'Occupation': _shares({'Other': 28617, 'Professional': 13628, 'Computer Programmer': 4478,
+                               'Executive': 4311, 'Teacher': 3759, 'Administrative Assistant': 3688,
+                               'Analyst': 3602, 'Sales - Commission': 3446, 'Accountant/CPA': 3233,
+                               'Clerical': 3164, 'Sales - Retail': 2797, 'Skilled Labor': 2746,
+                               'Retail Management': 2602, 'Nurse (RN)': 2489, 'Construction': 1790}),
+        'ListingCategory (numeric)': _shares({0: 16965, 1: 58308, 2: 7433, 3: 7189, 4: 2395, 5: 756, 6: 2572,
+                                              7: 10494, 8: 199, 9: 85, 10: 91, 11: 217, 12: 59, 13: 1996,
+                                              14: 876, 15: 1522, 16: 304, 17: 52, 18: 885, 19: 768, 20: 771}),
+        'Recommendations': _shares({0: 109678, 1: 3516, 2: 568, 3: 175}),
+        'IsBorrowerHomeowner': _shares({True: 57478, False: 56459})},
+    # share of missing values of the 113,937 rows of the export (the notebook's null counts)
+    'missing': {'BorrowerAPR': 25 / 113937, 'BorrowerState': 5515 / 113937, 'Occupation': 3588 / 113937,
+                'EmploymentStatus': 2255 / 113937, 'AmountDelinquent': 7622 / 113937},
+    # columns whose missing values (for IncomeRange: 'Not displayed') belong to the
+    # listings without a rating, which is why cleaning drops ~27% of rows rather than more
+    'missing_unrated': ['BorrowerState', 'EmploymentStatus', 'AmountDelinquent', 'IncomeRange'],
+    # quantiles at 0, 0.1, ..., 1
+    'quantiles': {'BorrowerRate': [0.0, 0.0895, 0.1139, 0.1359, 0.1585, 0.184, 0.2085, 0.2356, 0.2699, 0.3077,
+                                   0.4975],
+                  'BorrowerAPR': [0.00653, 0.1118, 0.1388, 0.1609, 0.1887, 0.2098, 0.2373, 0.2659, 0.2939,
+                                  0.3379, 0.51229],
+                  'Investors': [1, 1, 1, 6, 22, 44, 68, 99, 140, 200, 1189]},
+    # [median, sigma of the log, lowest, highest] of log-normal columns, positive part only
+    # for the ones with a share of zeros
+    'lognormal': {'LoanOriginalAmount': [6500, 0.65, 1000, 35000],
+                  'AmountDelinquent': [2500, 1.6, 1, 463881],
+                  'LoanCurrentDaysDelinquent': [500, 1.0, 1, 2704]},
+    'zeros': {'AmountDelinquent': 0.85, 'LoanCurrentDaysDelinquent': 0.84},
+    # share of loan amounts in whole thousands
+    'round_amounts': 0.6,
+    # correlation of the copula, in the order of copula_columns
+    'copula_columns': ['Term', 'BorrowerAPR', 'LoanOriginalAmount', 'BorrowerRate', 'Investors', 'ProsperScore',
+                       'ProsperRating (Alpha)'],
+    'correlation': [[1.0, 0.01, 0.34, 0.02, 0.0, 0.03, 0.03],
+                    [0.01, 1.0, -0.43, 0.99, -0.31, -0.67, -0.9],
+                    [0.34, -0.43, 1.0, -0.42, 0.32, 0.27, 0.43],
+                    [0.02, 0.99, -0.42, 1.0, -0.3, -0.65, -0.9],
+                    [0.0, -0.31, 0.32, -0.3, 1.0, 0.32, 0.3],
+                    [0.03, -0.67, 0.27, -0.65, 0.32, 1.0, 0.75],
+                    [0.03, -0.9, 0.43, -0.9, 0.3, 0.75, 1.0]]}
+
+# annual income bounds of the income ranges (monthly income is drawn inside them)
+income_bounds = {'$1-24,999': (1, 25_000), '$25,000-49,999': (25_000, 50_000), '$50,000-74,999': (50_000, 75_000),
+                 '$75,000-99,999': (75_000, 100_000), '$100,000+': (100_000, 600_000)}
+
+
+def _pick(rng, table, n):
+    # codes into table['values'] drawn with the table's weights
+    weights = np.asarray(table['weights'], dtype = float)
+    return rng.choice(len(weights), n, p = weights / weights.sum())
+
+
+def _discrete_quantile(table, u):
+    # codes of a discrete distribution at probabilities u
+    weights = np.asarray(table['weights'], dtype = float)
+    return np.minimum(np.searchsorted(np.cumsum(weights) / weights.sum(), u), len(weights) - 1)
+
+
+def _uniform(z):
+    # rank-based probabilities: uniform by construction and no normal cdf needed
+    u = np.empty(len(z))
+    u[np.argsort(z)] = (np.arange(len(z)) + 0.5) / len(z)
+    return u
+
+
+def _nearest_correlation(matrix):
+    # clip the eigenvalues so hand-entered or refitted matrices stay usable
+    values, vectors = np.linalg.eigh(np.asarray(matrix, dtype = float))
+    fixed = vectors @ np.diag(np.maximum(values, 1e-6)) @ vectors.T
+    scale = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(scale, scale)
+
+
+def _listing_dates(rng, model, n):
+    # each calendar day weighted by its year's share spread over the year's days,
+    # its month's share and its weekday's share; times of day uniform to the millisecond
+    start, stop = (np.datetime64(day, 'D') for day in model['listing_dates'])
+    days = np.arange(start, stop + 1)
+    years = days.astype('datetime64[Y]').astype(int) + 1970
+    months = days.astype('datetime64[M]').astype(int) % 12
+    weekdays = (days.astype(int) + 3) % 7
+
+    shares = model['shares']
+    year = dict(zip(shares['ListingCreationYear']['values'], shares['ListingCreationYear']['weights']))
+    month = np.asarray([dict(zip(shares['ListingCreationMonth']['values'], shares['ListingCreationMonth']['weights']))
+                        [name] for name in order['ListingCreationMonth']], dtype = float)
+    weekday = np.asarray([dict(zip(shares['ListingCreationDay']['values'], shares['ListingCreationDay']['weights']))
+                          [name] for name in order['ListingCreationDay']], dtype = float)
+    _, year_index, days_in_year = np.unique(years, return_inverse = True, return_counts = True)
+    weights = (np.array([year.get(y, 0) for y in years], dtype = float) / days_in_year[year_index]
+               * month[months] / month.mean() * weekday[weekdays] / weekday.mean())
+
+    picked = days[rng.choice(len(days), n, p = weights / weights.sum())]
+    return picked.astype('datetime64[ms]') + rng.integers(0, 86_400_000, n).astype('timedelta64[ms]')
+
+
+def _dictionary(values, codes, missing=None):
+    # categorical column as an arrow dictionary array, missing where codes < 0 or missing
+    mask = codes < 0 if missing is None else (codes < 0) | missing
+    return pa.DictionaryArray.from_arrays(pa.array(codes.astype(np.int32), mask = mask),
+                                          pa.array([str(value) for value in values]))
+
+
+def _numbers(values, missing=None):
+    mask = np.isnan(values) if missing is None and values.dtype.kind == 'f' else missing
+    return pa.array(values, mask = mask)
+
+
+def generate(rows, model=default_model, seed=0):
+    """ `rows` synthetic raw loans with the selected_variables columns, as an
+    arrow table (strings where the export has strings, missing values where
+    it has them) """
+    rng = np.random.default_rng(seed)
+    shares, columns = model['shares'], model['copula_columns']
+
+    dates = _listing_dates(rng, model, rows)
+    rated = dates >= np.datetime64(model['rating_start'])
+    unrated_share = max(1 - rated.mean(), 1 / rows)
+
+    def missing(column, share=None):
+        share = model['missing'].get(column, 0) if share is None else share
+        if column in model.get('missing_unrated', ()):
+            return ~rated & (rng.random(rows) < share / unrated_share)
+        return rng.random(rows) < share
+
+    # correlated numeric columns from one Gaussian draw
+    z = rng.standard_normal((rows, len(columns))) @ np.linalg.cholesky(_nearest_correlation(model['correlation'])).T
+    latent = dict(zip(columns, z.T))
+    probs = np.linspace(0, 1, 11)
+
+    term = np.asarray(shares['Term']['values'])[_discrete_quantile(shares['Term'], _uniform(latent['Term']))]
+    rate = np.interp(_uniform(latent['BorrowerRate']), probs, model['quantiles']['BorrowerRate'])
+    apr = np.interp(_uniform(latent['BorrowerAPR']), probs, model['quantiles']['BorrowerAPR'])
+    investors = np.interp(_uniform(latent['Investors']), probs, model['quantiles']['Investors']).round()
+    score = np.asarray(shares['ProsperScore']['values'], dtype = float)[
+        _discrete_quantile(shares['ProsperScore'], _uniform(latent['ProsperScore']))]
+    rating = _discrete_quantile(shares['ProsperRating (Alpha)'], _uniform(latent['ProsperRating (Alpha)']))
+
+    median, sigma, low, high = model['lognormal']['LoanOriginalAmount']
+    amount = np.clip(median * np.exp(sigma * latent['LoanOriginalAmount']), low, high)
+    whole = rng.random(rows) < model['round_amounts']
+    amount = np.where(whole, np.clip(np.round(amount, -3), low, high), np.round(amount))
+
+    def zero_inflated(column):
+        median, sigma, low, high = model['lognormal'][column]
+        positive = np.clip(np.round(median * np.exp(sigma * rng.standard_normal(rows))), low, high)
+        return np.where(rng.random(rows) < model['zeros'][column], 0, positive)
+
+    # monthly income inside the income range; 'Not employed' also sets the employment status
+    ranges = shares['IncomeRange']['values']
+    income_range = _pick(rng, shares['IncomeRange'], rows)
+    if 'Not displayed' in ranges:
+        hidden = ranges.index('Not displayed')
+        weights = np.asarray(shares['IncomeRange']['weights'], dtype = float)
+        shown = {'values': ranges, 'weights': np.where(np.arange(len(ranges)) == hidden, 0, weights)}
+        income_range = np.where(missing('IncomeRange', weights[hidden] / weights.sum()), hidden,
+                                _pick(rng, shown, rows))
+    income = np.round(4667 * np.exp(0.55 * rng.standard_normal(rows)), 2)
+    for code, name in enumerate(ranges):
+        rows_in = income_range == code
+        if name in income_bounds:
+            low, high = np.log(income_bounds[name])
+            income[rows_in] = np.round(np.exp(rng.uniform(low, high, rows_in.sum())) / 12, 2)
+        elif name in ('$0', 'Not employed'):
+            income[rows_in] = np.where(rng.random(rows_in.sum()) < 0.5, 0,
+                                       np.round(rng.uniform(0, 2500, rows_in.sum()), 2))
+    employment_values = list(shares['EmploymentStatus']['values'])
+    if 'Not employed' not in employment_values:
+        employment_values.append('Not employed')
+    employment = _pick(rng, shares['EmploymentStatus'], rows)
+    if 'Not employed' in ranges:
+        employment[income_range == ranges.index('Not employed')] = employment_values.index('Not employed')
+
+    listing = shares['ListingCategory (numeric)']
+    recommendations = shares['Recommendations']
+    homeowner = shares['IsBorrowerHomeowner']
+    apr_missing = missing('BorrowerAPR')
+    delinquent_missing = missing('AmountDelinquent')
+    table = {
+        'ListingCreationDate': pa.array(dates.astype('datetime64[ns]')),
+        'Term': pa.array(term.astype(np.int64)),
+        'LoanStatus': _dictionary(shares['LoanStatus']['values'], _pick(rng, shares['LoanStatus'], rows)),
+        'BorrowerAPR': _numbers(np.round(apr, 5), apr_missing),
+        'BorrowerRate': _numbers(np.round(rate, 4)),
+        'ProsperRating (Alpha)': _dictionary(shares['ProsperRating (Alpha)']['values'], rating, ~rated),
+        'ProsperScore': _numbers(score, ~rated),
+        'ListingCategory (numeric)': pa.array(np.asarray(listing['values'])[_pick(rng, listing, rows)]),
+        'BorrowerState': _dictionary(shares['BorrowerState']['values'], _pick(rng, shares['BorrowerState'], rows),
+                                     missing('BorrowerState')),
+        'Occupation': _dictionary(shares['Occupation']['values'], _pick(rng, shares['Occupation'], rows),
+                                  missing('Occupation')),
+        'EmploymentStatus': _dictionary(employment_values, employment, missing('EmploymentStatus')),
+        'IsBorrowerHomeowner': pa.array(np.asarray(homeowner['values'], dtype = bool)[_pick(rng, homeowner, rows)]),
+        'AmountDelinquent': _numbers(zero_inflated('AmountDelinquent'), delinquent_missing),
+        'IncomeRange': _dictionary(ranges, income_range),
+        'StatedMonthlyIncome': _numbers(income),
+        'LoanCurrentDaysDelinquent': pa.array(zero_inflated('LoanCurrentDaysDelinquent').astype(np.int64)),
+        'LoanOriginalAmount': pa.array(amount.astype(np.int64)),
+        'Recommendations': pa.array(np.asarray(recommendations['values'])[_pick(rng, recommendations, rows)]),
+        'Investors': pa.array(investors.astype(np.int64))}
+    return pa.table({column: table[column] for column in selected_variables})
+
+
+def write_synthetic(path, rows, model=default_model, seed=0, chunksize=1_000_000, pad_to=None):
+    """ write `rows` synthetic loans to path, csv or Parquet (.parquet / .pq),
+    a chunk of `chunksize` rows at a time. pad_to adds numeric filler columns
+    up to that many columns (81 gives the width of the real export).
+    Returns path """
+    parquet = str(path).endswith(('.parquet', '.pq'))
+    writer = None
+    try:
+        for i, start in enumerate(range(0, rows, chunksize)):
+            n = min(chunksize, rows - start)
+            table = generate(n, model, seed = [seed, i])
+            filler = np.random.default_rng([seed, i, 1])
+            for j in range(table.num_columns, pad_to or 0):
+                table = table.append_column('Column{}'.format(j - len(selected_variables)), pa.array(filler.random(n).round(4)))
+            if writer is None:
+                writer = (pq.ParquetWriter(path, table.schema) if parquet else
+                          pacsv.CSVWriter(path, table.schema, write_options = pacsv.WriteOptions(quoting_style = 'needed')))
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def _hist_quantiles(hist, probs):
+    # quantiles of a prosper.histogram.Histogram, linear inside each bin, between
+    # the first and the last non-empty bin
+    filled = np.flatnonzero(hist.counts)
+    if not len(filled):
+        return np.full(np.shape(probs), np.nan)
+    counts = hist.counts[filled[0]:filled[-1] + 1]
+    edges = hist.edges[filled[0]:filled[-1] + 2]
+    return np.interp(probs, np.r_[0, np.cumsum(counts)] / counts.sum(), edges)
+
+
+def fit_model(cube=None, hists=None, corr=None, base=default_model):
+    """ a copy of `base` refitted from the analysis's aggregates: category
+    shares from the count cube (prosper.aggregate.count_cube), the investor
+    quantiles and the loan amount's log-normal from the histograms
+    (prosper.histogram.loan_histograms) and the correlations of the numeric
+    columns from a prosper.correlation.Correlation. The aggregates are of the
+    cleaned loans, so the refitted model describes those; missing-value
+    shares stay those of base """
+    from prosper.aggregate import marginal
+    from prosper.schema import codebooks
+
+    model = json.loads(json.dumps(base))
+    if cube is not None:
+        names = {'State': ('BorrowerState', {name: code for code, name in states.items()})}
+        for dim in ['ListingCreationYear', 'ListingCreationMonth', 'ListingCreationDay', 'State', 'Term',
+                    'ProsperRating (Alpha)', 'ProsperScore', 'EmploymentStatus', 'IsBorrowerHomeowner']:
+            counts = marginal(cube, dim)
+            counts = counts[counts > 0]
+            column, rename = names.get(dim, (dim, {}))
+            model['shares'][column] = {'values': [_plain(rename.get(value, value)) for value in counts.index],
+                                       'weights': [int(count) for count in counts]}
+        # income categories go back to their ranges; the rows cleaning drops as not
+        # displayed or not employed keep their share of base
+        base_table = dict(zip(model['shares']['IncomeRange']['values'], model['shares']['IncomeRange']['weights']))
+        kept = {name: base_table[name] / sum(base_table.values())
+                for name in ('Not displayed', 'Not employed') if name in base_table}
+        ranges = {label: source for source, label in codebooks['IncomeCategory'].mapping.items()}
+        table = {ranges[label]: int(count) for label, count in marginal(cube, 'IncomeCategory').items() if count}
+        scale = sum(table.values()) / (1 - sum(kept.values()))
+        table.update({name: int(round(share * scale)) for name, share in kept.items()})
+        model['shares']['IncomeRange'] = _shares(table)
+
+    if hists is not None:
+        probs = np.linspace(0, 1, 11)
+        if 'Investors' in hists:
+            model['quantiles']['Investors'] = [float(q) for q in _hist_quantiles(hists['Investors'], probs)]
+        if 'LoanOriginalAmount' in hists:
+            hist = hists['LoanOriginalAmount']
+            low, median, high = _hist_quantiles(hist, [0.0, 0.5, 1.0])
+            spread = np.log(_hist_quantiles(hist, [0.8413])[0] / median)
+            model['lognormal']['LoanOriginalAmount'] = [float(median), float(spread), float(low), float(high)]
+
+    if corr is not None:
+        matrix = corr.corr()
+        columns = model['copula_columns']
+        for i, a in enumerate(columns):
+            for j, b in enumerate(columns):
+                if a in matrix.index and b in matrix.columns and not np.isnan(matrix.loc[a, b]):
+                    model['correlation'][i][j] = float(matrix.loc[a, b])
+    return model
+
+
+def _plain(value):
+    # numpy scalars to python ones, for json
+    return value.item() if hasattr(value, 'item') else value
+
+
+def save_model(model, path):
+    with open(path, 'w') as f:
+        json.dump(model, f, indent = 1)
+
+
+def load_model(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--rows', type = int, default = 1_000_000)
+    parser.add_argument('--out', default = 'synthetic.csv', help = 'csv or Parquet (.parquet) file')
+    parser.add_argument('--model', default = None, help = 'json model (default: the built-in one)')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--chunksize', type = int, default = 1_000_000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = default_model if args.model is None else load_model(args.model)
+    write_synthetic(args.out, args.rows, model, args.seed, args.chunksize)
+    print('{:,} rows written to {} in {:.1f}s'.format(args.rows, args.out, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
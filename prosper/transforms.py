@@ -0,0 +1,60 @@
+"""Whole-column transforms and the derived columns built from them.
+
+Every transform works on a complete array or Series at once. Derived columns
+are listed in `derived` and only computed when a chart asks for them through
+with_derived.
+"""
+
+import numpy as np
+
+
+def log_trans(x, inverse = False):
+    """ quick function for computing log and power operations, on a whole
+    column at a time """
+    if not inverse:
+        # in float64 whatever the column's storage dtype
+        return np.log10(x, dtype = float)
+    else:
+        return np.power(10.0, x)
+
+
+def safe_log10(x):
+    """ log10 for columns with zeros, like AmountDelinquent: values that are
+    not positive become NaN instead of -inf """
+    x = np.asarray(x, dtype = float)
+    out = np.full(x.shape, np.nan)
+    np.log10(x, out = out, where = x > 0)
+    return out
+
+
+def tick_labels(values):
+    """ short labels for tick values: 500 -> '500', 1500 -> '1.5k', 45000 -> '45k' """
+    values = np.asarray(values, dtype = float)
+    thousands = values >= 1000
+    scaled = np.where(thousands, values / 1000, values)
+    labels = np.char.mod('%g', scaled)
+    return np.where(thousands, np.char.add(labels, 'k'), labels).tolist()
+
+
+def log_ticks(values, labels=None):
+    """ positions of `values` on a log10 axis and their labels (tick_labels by
+    default), ready for ax.set_yticks(*log_ticks(...)) """
+    if labels is None:
+        labels = tick_labels(values)
+    return log_trans(np.asarray(values, dtype = float)), labels
+
+
+# derived column -> (source column, transform)
+derived = {'Log_Investors': ('Investors', log_trans),
+           'Log_LoanOriginalAmount': ('LoanOriginalAmount', log_trans),
+           'Log_StatedMonthlyIncome': ('StatedMonthlyIncome', safe_log10),
+           'Log_AmountDelinquent': ('AmountDelinquent', safe_log10)}
+
+
+def with_derived(df, names):
+    """ df with the derived columns in `names` added. Columns df already has
+    are not recomputed, and df itself is returned when nothing is missing """
+    missing = [name for name in names if name not in df]
+    if not missing:
+        return df
+    return df.assign(**{name: derived[name][1](df[derived[name][0]].to_numpy()) for name in missing})
@@ -0,0 +1,9 @@
+import pytest
+
+from prosper.synth import write_synthetic
+
+
+@pytest.fixture(scope = 'session')
+def loans_csv(tmp_path_factory):
+    """ a small synthetic export with the columns of the real one """
+    return write_synthetic(str(tmp_path_factory.mktemp('export') / 'prosperLoanData.csv'), 4000, seed = 1)
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from prosper import cleaning
+from prosper.cache import StageCache, dependencies, run_pipeline, stage_keys
+from prosper.dates import civil_from_days
+from prosper.loader import load_loans
+
+
+def test_pipeline_matches_clean_and_is_served_from_the_cache(loans_csv, tmp_path, monkeypatch):
+    cache = StageCache(str(tmp_path))
+    expected = cleaning.clean(load_loans(loans_csv))
+    assert len(expected)
+    pd.testing.assert_frame_equal(run_pipeline(loans_csv, cache), expected)
+    assert len(cache.entries()) == len(cleaning.stages)
+
+    # nothing changed: the last stage's output is read back and no stage runs
+    monkeypatch.setattr(StageCache, 'put', lambda *args: pytest.fail('a stage ran again'))
+    pd.testing.assert_frame_equal(run_pipeline(loans_csv, cache), expected)
+
+
+def test_changing_a_stage_invalidates_it_and_every_later_stage(loans_csv):
+    keys = stage_keys(loans_csv)
+    assert stage_keys(loans_csv) == keys
+
+    stages = list(cleaning.stages)
+    i = [stage.name for stage in stages].index('order_categories')
+    stages[i] = stages[i]._replace(params = {'columns': ['ProsperRating (Alpha)']})
+    changed = stage_keys(loans_csv, stages)
+    assert changed[:i] == keys[:i]
+    assert all(new != old for new, old in zip(changed[i:], keys[i:]))
+
+
+def test_changing_the_input_invalidates_every_stage(loans_csv, tmp_path):
+    other = tmp_path / 'other.csv'
+    with open(loans_csv, 'rb') as f:
+        other.write_bytes(f.read() + b'\n')
+    assert not set(stage_keys(str(other))) & set(stage_keys(loans_csv))
+
+
+def test_helpers_are_part_of_the_stage_code():
+    assert cleaning._fits in dependencies(cleaning.compact)
+    assert civil_from_days in dependencies(cleaning.extract_date_parts)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from prosper.correlation import Correlation, merge_correlations, rank_digests, segment_correlations
+
+columns = ['a', 'b', 'c']
+
+
+def _frame(rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    a = rng.normal(1e4, 50, rows)
+    df = pd.DataFrame({'a': a, 'b': 0.3 * a + rng.normal(0, 20, rows), 'c': np.exp(rng.normal(0, 1, rows)),
+                       'year': rng.choice([2012, 2013, 2014], rows)})
+    # missing values are dropped pairwise, as DataFrame.corr does
+    df.loc[::7, 'a'] = np.nan
+    df.loc[::11, 'c'] = np.nan
+    return df
+
+
+def test_merged_chunks_match_dataframe_corr_and_cov():
+    df = _frame()
+    merged = Correlation(columns)
+    for chunk in (df.iloc[:1000], df.iloc[1000:1001], df.iloc[1001:]):
+        merged += Correlation(columns).update(chunk)
+    whole = Correlation(columns).update(df)
+    for corr in (merged, whole):
+        pd.testing.assert_frame_equal(corr.corr(), df[columns].corr(), rtol = 0, atol = 1e-12)
+        pd.testing.assert_frame_equal(corr.cov(), df[columns].cov(), rtol = 1e-10)
+
+
+def test_segments_merged_across_months_match_each_segment():
+    df = _frame()
+    merged = merge_correlations(segment_correlations(df.iloc[:1500], 'year', columns),
+                                segment_correlations(df.iloc[1500:], 'year', columns))
+    for year, rows in df.groupby('year'):
+        pd.testing.assert_frame_equal(merged[year].corr(), rows[columns].corr(), rtol = 0, atol = 1e-12)
+
+
+def test_ranked_correlation_approximates_spearman():
+    df = _frame()
+    corr = Correlation(columns, rank_digests(df, columns)).update(df)
+    pd.testing.assert_frame_equal(corr.corr(), df[columns].corr('spearman'), rtol = 0, atol = 0.01)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from prosper.dates import civil_from_days, date_features, date_labels, days_from_civil, parse_timestamps
+
+
+def test_civil_dates_match_numpy_across_centuries():
+    # 1600-03-01 to 2400-12-31: leap centuries, negative days and the epoch
+    days = np.arange(np.datetime64('1600-03-01', 'D').astype(int), np.datetime64('2401-01-01', 'D').astype(int))
+    year, month, day = civil_from_days(days)
+    dates = days.astype('datetime64[D]')
+    np.testing.assert_array_equal(year, dates.astype('datetime64[Y]').astype(int) + 1970)
+    np.testing.assert_array_equal(month, dates.astype('datetime64[M]').astype(int) % 12 + 1)
+    np.testing.assert_array_equal(day, (dates - dates.astype('datetime64[M]')).astype(int) + 1)
+    np.testing.assert_array_equal(days_from_civil(year, month, day), days)
+
+
+def test_features_match_the_dt_accessor():
+    rng = np.random.default_rng(0)
+    ns = rng.integers(np.datetime64('1999-01-01', 'ns').astype(np.int64),
+                      np.datetime64('2031-01-01', 'ns').astype(np.int64), 20000)
+    dates = pd.Series(ns.astype('datetime64[ns]'))
+    features = date_features(dates, ['year', 'day', 'month', 'weekday', 'quarter', 'iso_week', 'hour'])
+
+    np.testing.assert_array_equal(features['year'], dates.dt.year)
+    np.testing.assert_array_equal(features['day'], dates.dt.day)
+    np.testing.assert_array_equal(features['month'].cat.codes + 1, dates.dt.month)
+    np.testing.assert_array_equal(features['weekday'].cat.codes, dates.dt.weekday)
+    np.testing.assert_array_equal(features['quarter'].cat.codes + 1, dates.dt.quarter)
+    np.testing.assert_array_equal(features['iso_week'].astype(int), dates.dt.isocalendar().week)
+    np.testing.assert_array_equal(features['hour'].astype(int), dates.dt.hour)
+    assert list(features['weekday'].cat.categories) == date_labels['weekday']
+
+
+def test_missing_dates_stay_missing():
+    dates = pd.Series(pd.to_datetime(['2013-12-30 10:00', None, '1969-12-31 23:59']))
+    features = date_features(dates, ['year', 'month', 'iso_week'])
+    assert features['year'].isna().tolist() == [False, True, False]
+    assert features['year'].tolist()[::2] == [2013, 1969]
+    assert features['month'].isna().tolist() == [False, True, False]
+    # both fall in ISO week 1 of the next year
+    assert features['iso_week'].tolist()[::2] == [1, 1]
+
+
+def test_timestamps_parse_like_pandas():
+    values = pd.Series(['2007-08-26 19:09:29.263000000', '2014-02-27 08:28:07.900000000', None])
+    pd.testing.assert_series_equal(parse_timestamps(values), pd.to_datetime(values, format = 'ISO8601'),
+                                   check_dtype = False)
+    assert parse_timestamps(values).dtype == 'datetime64[ns]'
+    # time zones go through pd.to_datetime
+    zoned = pd.Series(['2013-01-01T00:00:00+02:00'])
+    pd.testing.assert_series_equal(parse_timestamps(zoned), pd.to_datetime(zoned, format = 'ISO8601'))
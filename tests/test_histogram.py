@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from prosper.histogram import Histogram, grouped_histograms, loan_histograms, merge_histograms
+
+
+def _loans(rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    income = rng.lognormal(8.5, 0.8, rows)
+    income[::97] = np.nan
+    return pd.DataFrame({'StatedMonthlyIncome': income,
+                         'LoanOriginalAmount': rng.integers(1000, 35001, rows).astype(float),
+                         'AmountDelinquent': rng.lognormal(6, 2, rows),
+                         'Investors': rng.integers(1, 400, rows).astype(float),
+                         'Term': rng.choice([12, 36, 60], rows)})
+
+
+def test_counts_match_np_histogram_including_the_last_edge():
+    hist = Histogram.linear(0, 10, 1)
+    values = np.array([0, 0.5, 1, 9.999, 10, 10.5, -1, np.nan])
+    hist.update(values)
+    expected, _ = np.histogram(values[~np.isnan(values)], bins = hist.edges)
+    np.testing.assert_array_equal(hist.counts, expected)
+    assert hist.counts[-1] == 2
+
+
+def test_merged_chunks_equal_one_pass():
+    df = _loans()
+    whole = loan_histograms(df)
+    merged = merge_histograms(*(loan_histograms(chunk) for chunk in (df.iloc[:500], df.iloc[500:1200], df.iloc[1200:])))
+    assert merged.keys() == whole.keys()
+    for key in whole:
+        np.testing.assert_array_equal(merged[key].counts, whole[key].counts)
+
+
+def test_grouped_histograms_add_up_to_the_whole():
+    df = _loans()
+    groups = grouped_histograms(df, 'Term')
+    whole = loan_histograms(df)
+    for key in whole:
+        np.testing.assert_array_equal(sum(groups[term][key].counts for term in groups), whole[key].counts)
+    np.testing.assert_array_equal(groups[36]['Investors'].counts,
+                                  loan_histograms(df[df['Term'] == 36])['Investors'].counts)
+
+
+def test_linear_and_log_views_count_the_same_column():
+    df = _loans()
+    hists = loan_histograms(df)
+    income = df['StatedMonthlyIncome'].dropna()
+    assert hists['StatedMonthlyIncome:linear'].total() == (income <= 200_000).sum()
+    edges = hists['StatedMonthlyIncome'].edges
+    assert hists['StatedMonthlyIncome'].total() == ((income >= edges[0]) & (income <= edges[-1])).sum()
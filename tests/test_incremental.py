@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from prosper import cleaning
+from prosper.aggregate import count_cube, crosstab, cube_dims, cube_pairs, marginal
+from prosper.correlation import Correlation
+from prosper.histogram import loan_histograms
+from prosper.incremental import IncrementalStore
+from prosper.loader import load_loans
+from prosper.plotting import numeric_vars
+
+
+def test_appends_match_a_full_recompute(loans_csv, tmp_path):
+    raw = load_loans(loans_csv)
+    dates = pd.to_datetime(raw['ListingCreationDate'], format = 'ISO8601')
+    cutoff = dates.quantile(0.6)
+
+    store = IncrementalStore(tmp_path / 'store')
+    first = store.append(raw[(dates <= cutoff).to_numpy()])
+    # the cumulative export: only the rows after the watermark are new
+    second = store.append(loans_csv)
+    assert store.append(loans_csv) == 0
+
+    full = cleaning.clean(raw)
+    assert first and second and first + second == len(store) == len(full)
+    assert store.watermark == dates.max()
+
+    # a reopened store has the same state as the one appended to
+    store = IncrementalStore(tmp_path / 'store')
+    # parts are stored in append order; listing times identify the loans
+    assert full['ListingCreationDate'].is_unique
+    pd.testing.assert_frame_equal(store.loans().sort_values('ListingCreationDate', ignore_index = True),
+                                  full.sort_values('ListingCreationDate', ignore_index = True),
+                                  check_categorical = False)
+
+    cube = count_cube(full)
+    assert store.cube.total == cube.total
+    for dim in cube_dims:
+        pd.testing.assert_series_equal(marginal(store.cube, dim), marginal(cube, dim))
+    for pair in cube_pairs:
+        pd.testing.assert_frame_equal(crosstab(store.cube, *pair), crosstab(cube, *pair))
+    for key, hist in loan_histograms(full).items():
+        np.testing.assert_array_equal(store.hists[key].counts, hist.counts)
+    pd.testing.assert_frame_equal(store.corr.corr(), Correlation(numeric_vars).update(full).corr(),
+                                  rtol = 0, atol = 1e-12)
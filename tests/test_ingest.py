@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from prosper import cleaning
+from prosper.ingest import discover_shards, ingest, merge_frames
+from prosper.loader import load_loans
+from prosper.synth import write_synthetic
+
+
+@pytest.fixture(scope = 'module')
+def shards(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('shards')
+    for i in range(3):
+        write_synthetic(str(directory / 'prosper-{:03d}.csv'.format(i)), 1500, seed = 10 + i)
+    return str(directory)
+
+
+def test_ingest_matches_cleaning_each_file(shards):
+    expected = pd.concat([cleaning.clean(load_loans(path)) for path in discover_shards(shards)],
+                         ignore_index = True)
+    loans = ingest(shards, workers = 2)
+    # concat turns categoricals whose categories differ between files into strings
+    # where ingest unites the categories, so values are compared, as concat has them
+    pd.testing.assert_frame_equal(loans.astype(expected.dtypes.to_dict()), expected, check_categorical = False)
+    pd.testing.assert_frame_equal(ingest(shards, workers = 1), loans)
+
+
+def test_merged_categories_are_the_sorted_union():
+    frames = [pd.DataFrame({'State': pd.Categorical(['Ohio', 'Texas'])}),
+              pd.DataFrame({'State': pd.Categorical(['Alaska'])})]
+    merged = merge_frames(frames)
+    assert list(merged['State'].cat.categories) == ['Alaska', 'Ohio', 'Texas']
+    assert list(merged['State']) == ['Ohio', 'Texas', 'Alaska']
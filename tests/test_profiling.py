@@ -0,0 +1,50 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prosper import profiling
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampled_stage_is_recorded_and_collapsed():
+    profiler = profiling.enable(['busy'], mode = 'sample', interval = 0.001)
+    try:
+        with profiler.stage('outer'):
+            profiling.profiled('busy')(_busy)(0.05)
+    finally:
+        profiling.disable()
+
+    assert [record['stage'] for record in profiler.records] == ['busy', 'outer']
+    assert profiler.records[0]['profile'] == 'sampled'
+    assert profiler.samples
+    assert all(key.startswith('outer;busy') for key in profiler.samples)
+    assert any('_busy' in stack for stack in profiler.collapsed())
+    # the stage stack is unwound, so a later stage is outermost again
+    assert profiler._stacks[next(iter(profiler._stacks))] == []
+
+
+def test_stages_in_threads_keep_their_own_stacks():
+    profiler = profiling.enable(['busy'], mode = 'sample', interval = 0.001)
+    started = threading.Barrier(2)
+
+    def work(_):
+        with profiler.stage('outer'):
+            # both threads are inside 'outer' before either starts its inner stage
+            started.wait()
+            profiling.profiled('busy')(_busy)(0.05)
+
+    try:
+        with ThreadPoolExecutor(max_workers = 2) as pool:
+            list(pool.map(work, range(2)))
+    finally:
+        profiling.disable()
+
+    assert sorted(record['path'] for record in profiler.records) == ['outer', 'outer', 'outer;busy', 'outer;busy']
+    assert profiler.samples
+    assert all(key.startswith('outer;busy') for key in profiler.samples)
+    assert all(stack == [] for stack in profiler._stacks.values())
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from prosper.query import LoanIndex
+
+rows = 1001  # not a whole number of 64-bit words
+
+
+@pytest.fixture(scope = 'module')
+def loans():
+    rng = np.random.default_rng(0)
+    apr = rng.uniform(0.05, 0.4, rows).astype('float32')
+    apr[::13] = np.nan
+    return pd.DataFrame({'State': pd.Categorical(rng.choice(['California', 'Texas', 'Ohio'], rows)),
+                         'Term': rng.choice([12, 36, 60], rows),
+                         'LoanOriginalAmount': rng.integers(1000, 35001, rows).astype('int32'),
+                         'BorrowerAPR': apr})
+
+
+@pytest.fixture(scope = 'module')
+def index(loans):
+    # few bins, so ranges often start or stop on a bin boundary
+    return LoanIndex(loans, ['State', 'Term'], ['LoanOriginalAmount', 'BorrowerAPR'], range_bins = 4)
+
+
+def _check(selection, expected):
+    np.testing.assert_array_equal(selection.mask(), np.asarray(expected))
+    assert selection.count() == np.asarray(expected).sum()
+
+
+def test_ranges_match_between_at_and_around_bin_boundaries(loans, index):
+    for column in ('LoanOriginalAmount', 'BorrowerAPR'):
+        bounds, _ = index.cumulative[column]
+        order, sorted_values = index.orders[column]
+        values = sorted_values[np.minimum(bounds, len(sorted_values) - 1)]
+        cuts = sorted(set(values) | {values[1] + 1, values[2] - 1, sorted_values[0] - 1, sorted_values[-1] + 1})
+        for low in cuts:
+            for high in cuts:
+                for inclusive in ('both', 'left', 'right', 'neither'):
+                    _check(index.between(column, low, high, inclusive),
+                           loans[column].between(low, high, inclusive = inclusive))
+        _check(index.between(column, None, values[2]), loans[column] <= values[2])
+        _check(index.between(column, values[1], None), loans[column] >= values[1])
+
+
+def test_membership_of_sorted_and_bitmap_columns(loans, index):
+    amounts = list(loans['LoanOriginalAmount'].iloc[[0, 5, 500]]) + [-1]
+    _check(index.isin('LoanOriginalAmount', amounts), loans['LoanOriginalAmount'].isin(amounts))
+    _check(index.isin('State', ['Texas', 'Nowhere']), loans['State'] == 'Texas')
+    _check(index.isin('State', []), np.zeros(rows, bool))
+
+
+def test_complements_leave_the_padding_bits_clear(loans, index):
+    everything = index.everything()
+    assert everything.count() == rows
+    assert (~everything).count() == 0
+    _check(index.ne('Term', 36), loans['Term'] != 36)
+    _check(~index.between('BorrowerAPR', 0.1, 0.2), ~loans['BorrowerAPR'].between(0.1, 0.2))
+    _check(everything - index.eq('State', 'Ohio'), loans['State'] != 'Ohio')
+
+
+def test_select_and_take(loans, index):
+    selection = index.select({'Term': 36, 'BorrowerAPR': (0.1, 0.2), 'State': ['California', 'Texas']})
+    expected = ((loans['Term'] == 36) & loans['BorrowerAPR'].between(0.1, 0.2)
+                & loans['State'].isin(['California', 'Texas']))
+    _check(selection, expected)
+    pd.testing.assert_frame_equal(index.take(selection), loans[expected])
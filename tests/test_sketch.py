@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from prosper.sketch import TDigest, grouped_digests, merge_grouped
+
+probs = np.array([0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999])
+
+
+def _rank_error(digest, values):
+    # how far the digest's quantiles are from the requested ranks of values
+    ranks = np.searchsorted(np.sort(values), [digest.quantile(q) for q in probs]) / len(values)
+    return np.abs(ranks - probs).max()
+
+
+def test_merged_chunks_keep_the_accuracy_of_one_pass():
+    values = np.random.default_rng(0).lognormal(8, 1, 20000)
+    whole = TDigest().update(values)
+    merged = TDigest()
+    for chunk in np.array_split(values, 7):
+        merged.merge(TDigest().update(chunk))
+
+    for digest in (whole, merged):
+        assert digest.count == len(values)
+        assert (digest.min, digest.max) == (values.min(), values.max())
+        assert abs(digest.mean() - values.mean()) < 1e-9 * values.mean()
+        # rank error of order 1 / compression
+        assert _rank_error(digest, values) < 0.005
+        assert len(digest.means) <= digest.compression
+
+
+def test_grouped_digests_match_a_digest_per_group():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'group': rng.choice(['a', 'b', 'c'], 9000), 'value': rng.normal(0, 1, 9000)})
+    df.loc[::50, 'value'] = np.nan
+    halves = [grouped_digests(df.iloc[:4000], 'group', 'value'), grouped_digests(df.iloc[4000:], 'group', 'value')]
+    merged = merge_grouped(*halves)
+    for group, values in df.groupby('group')['value']:
+        values = values.dropna().to_numpy()
+        for digests in (grouped_digests(df, 'group', 'value'), merged):
+            assert digests[group].count == len(values)
+            assert _rank_error(digests[group], values) < 0.005